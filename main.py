@@ -41,9 +41,11 @@ sys.path.insert(0, str(project_root))
 try:
     from utils.logging_config import configure_logging
     from utils.review_needed import summarize_review_needed
+    from utils.sync_context import build_sync_context
 except ImportError:
     from src.utils.logging_config import configure_logging
     from src.utils.review_needed import summarize_review_needed
+    from src.utils.sync_context import build_sync_context
 
 # Configure logging
 configure_logging()
@@ -281,9 +283,9 @@ def run_pipeline():
     base_dir = Path(__file__).parent
     scripts = [
         {"name": "URL_Sourcing", "path": base_dir / "src" / "01_URL_Sourcing.py"},
-        {"name": "PDF_Download_Supabase", "path": base_dir / "src" / "02_PDF_Download_Supabase.py"},
-        {"name": "SyncEnhancement", "path": base_dir / "src" / "03a_SyncEnhancement.py"},
-        {"name": "TableEnhancement_Supabase", "path": base_dir / "src" / "03b_TableEnhancement_Supabase.py"},
+        {"name": "PDF_Download_Supabase", "path": base_dir / "src" / "02_PDF_Download_Supabase.py", "uses_sync_context": True},
+        {"name": "SyncEnhancement", "path": base_dir / "src" / "03a_SyncEnhancement.py", "uses_sync_context": True},
+        {"name": "TableEnhancement_Supabase", "path": base_dir / "src" / "03b_TableEnhancement_Supabase.py", "uses_sync_context": True},
         {"name": "SyncProcessed", "path": base_dir / "src" / "04a_SyncProcessed.py"},
         {"name": "LLM_Extraction_Supabase", "path": base_dir / "src" / "04b_LLM_Extraction_Supabase.py"},
         {"name": "SyncCombiningStatus", "path": base_dir / "src" / "05a_SyncCombiningStatus.py"},
@@ -300,6 +302,8 @@ def run_pipeline():
     step_summaries = []
     pipeline_start_time = time.time()
     total_steps = len(scripts)
+    # Engine and B2 listing shared by the sync stages; built on first use
+    sync_context = None
     
     # Execute each script in sequence
     for i, script in enumerate(scripts):
@@ -324,7 +328,12 @@ def run_pipeline():
             # Check if the module has a main function
             if hasattr(module, "main"):
                 try:
-                    module.main()
+                    if script.get("uses_sync_context"):
+                        if sync_context is None:
+                            sync_context = build_sync_context()
+                        module.main(sync_context)
+                    else:
+                        module.main()
                 except SystemExit as e:
                     # If the script exits with code 1, log it and continue with the next script
                     # This handles cases where environment variables are missing
@@ -112,20 +112,24 @@ def run_gemini_extraction(
             "warnings": [],
         }
 
-    from src.utils.extraction_validation import validate_extraction_results
-    from src.utils.gemini_extractor import extract_table_with_gemini, parse_gemini_response
+    from src.utils.extraction_validation import validate_latest_extractions
+    from src.utils.gemini_extractor import extract_table_with_gemini, load_image_part, parse_gemini_response
 
     extraction_dir = output_dir / "gemini"
     extraction_dir.mkdir(parents=True, exist_ok=True)
     attempts = []
+    parsed_outputs = []  # Parsed outputs kept across attempts, as in the production stage
+    image_part = load_image_part(image_path)
 
     for attempt in range(1, max_attempts + 1):
-        parsed_data = []
+        new_count = 0
         responses_ok = 0
         parse_errors = []
 
-        for iteration in range(1, 3):
-            success, response = extract_table_with_gemini(str(image_path), model)
+        # Extract twice at first; retries only add what is needed for a new pair,
+        # which is compared against every earlier output
+        for iteration in range(1, max(1, 2 - len(parsed_outputs)) + 1):
+            success, response = extract_table_with_gemini(str(image_path), model, image_part=image_part)
             if not success:
                 parse_errors.append(f"iteration {iteration}: {response}")
                 continue
@@ -136,10 +140,11 @@ def run_gemini_extraction(
                 parse_errors.append(f"iteration {iteration}: {parsed}")
                 continue
 
-            parsed_data.append(parsed)
+            parsed_outputs.append(parsed)
+            new_count += 1
             write_json(extraction_dir / f"attempt_{attempt}_iteration_{iteration}.json", parsed)
 
-        if len(parsed_data) < 2:
+        if new_count == 0 or len(parsed_outputs) < 2:
             attempts.append(
                 {
                     "attempt": attempt,
@@ -151,7 +156,9 @@ def run_gemini_extraction(
             )
             continue
 
-        validation_result = validate_extraction_results(parsed_data, enhanced_name, attempt, max_attempts)
+        validation_result = validate_latest_extractions(
+            parsed_outputs, new_count, enhanced_name, attempt, max_attempts
+        )
         attempt_summary = {
             "attempt": attempt,
             "status": validation_result.status,
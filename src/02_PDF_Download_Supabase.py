@@ -30,7 +30,7 @@ Dependencies:
 import os
 import logging
 from pathlib import Path
-from typing import Set, List, Tuple
+from typing import Set, List, Tuple, Optional
 
 from sqlalchemy import text, update
 from sqlalchemy.orm import Session
@@ -38,15 +38,13 @@ from sqlalchemy.orm import Session
 # Attempt to import utility functions, supporting both direct and main.py execution
 try:
     from utils.cloud_storage import get_b2_file_list
-    from utils.db_utils import get_db_engine
     from utils.logging_config import configure_logging
-    from utils.cloud_storage import get_b2_report_filenames 
+    from utils.sync_context import SyncContext, build_sync_context
 except ImportError:
     # This fallback is for when the script is run from the project root as part of main.py
     from src.utils.cloud_storage import get_b2_file_list
-    from src.utils.db_utils import get_db_engine
     from src.utils.logging_config import configure_logging
-    from src.utils.cloud_storage import get_b2_report_filenames
+    from src.utils.sync_context import SyncContext, build_sync_context
 
 # Configure logging
 configure_logging()
@@ -261,39 +259,26 @@ def download_pdfs(engine):
             logging.error("Transaction rolled back.")
 
 
-def main():
+def main(ctx: Optional[SyncContext] = None):
     """
     Main function to orchestrate the download status synchronization.
+
+    Args:
+        ctx: Shared sync context from main.py. Built here when run directly.
     """
     logging.info("Starting Lassa Fever Report Download Status Synchronizer...")
 
-    # Critical environment variable checks
-    if not DATABASE_URL:
-        logging.critical("CRITICAL: DATABASE_URL environment variable not set. Exiting.")
-        return
-    
-    b2_env_vars_present = (
-        os.environ.get('B2_APPLICATION_KEY_ID') and
-        os.environ.get('B2_APPLICATION_KEY') and
-        os.environ.get('B2_BUCKET_NAME')
-    )
-    if not b2_env_vars_present:
-        logging.critical("CRITICAL: B2 environment variables (B2_APPLICATION_KEY_ID, B2_APPLICATION_KEY, B2_BUCKET_NAME) not fully set. Exiting.")
-        return
-    
+    if ctx is None:
+        ctx = build_sync_context(DATABASE_URL)
+        if ctx is None:
+            return
+    engine = ctx.engine
+
     if not B2_REPORTS_PREFIX:
         logging.warning("B2_REPORTS_PREFIX is not set or is empty. This might lead to incorrect file matching if reports are not at bucket root.")
         # Allow proceeding but with a warning.
 
-    try:
-        engine = get_db_engine(DATABASE_URL)
-        with engine.connect() as connection: # Test connection
-            logging.info("Successfully connected to Supabase database.")
-    except Exception as e:
-        logging.critical(f"CRITICAL: Failed to create SQLAlchemy engine or connect to Supabase: {e}", exc_info=True)
-        return
-
-    b2_report_files = get_b2_report_filenames(B2_REPORTS_PREFIX, ".pdf")
+    b2_report_files = ctx.b2_report_filenames(B2_REPORTS_PREFIX, ".pdf")
     
     # Proceed with sync even if b2_report_files is empty; sync_download_status handles this.
     sync_download_status(engine, b2_report_files)
@@ -43,11 +43,11 @@ try:
         layout_qa_name_for_enhanced,
         layout_qa_path_for_enhanced_path,
     )
-    from utils.db_utils import get_db_engine
     from utils.logging_config import configure_logging
-    from utils.cloud_storage import download_file, get_b2_report_filenames
+    from utils.cloud_storage import download_file
     from utils.review_needed import record_review_needed
     from utils.status_qa import QAStatusResult, check_layout_qa_file
+    from utils.sync_context import SyncContext, build_sync_context
 except ImportError:
     # This fallback is for when the script is run from the project root as part of main.py
     from src.utils.artifact_paths import (
@@ -56,11 +56,11 @@ except ImportError:
         layout_qa_name_for_enhanced,
         layout_qa_path_for_enhanced_path,
     )
-    from src.utils.db_utils import get_db_engine
     from src.utils.logging_config import configure_logging
-    from src.utils.cloud_storage import download_file, get_b2_report_filenames
+    from src.utils.cloud_storage import download_file
     from src.utils.review_needed import record_review_needed
     from src.utils.status_qa import QAStatusResult, check_layout_qa_file
+    from src.utils.sync_context import SyncContext, build_sync_context
 
 # Configure logging
 configure_logging()
@@ -187,7 +187,7 @@ def sync_enhanced_status(engine, b2_filenames: Set[str], b2_layout_qa_filenames:
                  logging.info("B2 filename list is empty, skipping B2 to Supabase sync (no files to mark as enhanced).")
             else:
                 logging.info(f"Found {len(b2_filenames)} files in B2 to check")
-                logging.info(f"Raw B2 filenames: {b2_filenames}")
+                logging.debug("Raw B2 filenames: %s", b2_filenames)
                 # First, we need to handle records with empty enhanced_name
                 # Get all records that need enhancement and have been downloaded
                 stmt_select_records_needing_enhancement = text(f"""
@@ -275,40 +275,27 @@ def sync_enhanced_status(engine, b2_filenames: Set[str], b2_layout_qa_filenames:
             logging.error(f"Error during Supabase synchronization: {e}", exc_info=True)
             logging.error("Transaction rolled back.")
 
-def main():
+def main(ctx: Optional[SyncContext] = None):
     """
     Main function to orchestrate the download status synchronization.
+
+    Args:
+        ctx: Shared sync context from main.py. Built here when run directly.
     """
     logging.info("Starting Lassa Fever Report Enhanced Status Synchronizer...")
 
-    # Critical environment variable checks
-    if not DATABASE_URL:
-        logging.critical("CRITICAL: DATABASE_URL environment variable not set. Exiting.")
-        return
-    
-    b2_env_vars_present = (
-        os.environ.get('B2_APPLICATION_KEY_ID') and
-        os.environ.get('B2_APPLICATION_KEY') and
-        os.environ.get('B2_BUCKET_NAME')
-    )
-    if not b2_env_vars_present:
-        logging.critical("CRITICAL: B2 environment variables (B2_APPLICATION_KEY_ID, B2_APPLICATION_KEY, B2_BUCKET_NAME) not fully set. Exiting.")
-        return
-    
+    if ctx is None:
+        ctx = build_sync_context(DATABASE_URL)
+        if ctx is None:
+            return
+    engine = ctx.engine
+
     if not B2_REPORTS_PREFIX:
         logging.warning("B2_REPORTS_PREFIX is not set or is empty. This might lead to incorrect file matching if reports are not at bucket root.")
         # Allow proceeding but with a warning.
 
-    try:
-        engine = get_db_engine(DATABASE_URL)
-        with engine.connect() as connection: # Test connection
-            logging.info("Successfully connected to Supabase database.")
-    except Exception as e:
-        logging.critical(f"CRITICAL: Failed to create SQLAlchemy engine or connect to Supabase: {e}", exc_info=True)
-        return
-
-    b2_report_files = get_b2_report_filenames(B2_REPORTS_PREFIX, ".png")
-    b2_layout_qa_files = get_b2_report_filenames(B2_REPORTS_PREFIX, ".layout_qa.json")
+    b2_report_files = ctx.b2_report_filenames(B2_REPORTS_PREFIX, ".png")
+    b2_layout_qa_files = ctx.b2_report_filenames(B2_REPORTS_PREFIX, ".layout_qa.json")
     
     # Proceed with sync even if b2_report_files is empty; sync_download_status handles this.
     sync_enhanced_status(engine, b2_report_files, b2_layout_qa_files)
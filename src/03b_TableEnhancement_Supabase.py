@@ -10,7 +10,7 @@ It performs the following actions:
 1. Connects to Supabase and retrieves a list of reports that need enhancement
    (downloaded = 'Y' and enhanced != 'Y')
 2. For each report:
-   a. Downloads the PDF from B2 to a temporary location
+   a. Downloads the PDF from B2 when it is not already local (in the worker)
    b. Enhances the table by improving line visibility
    c. Uploads the enhanced image to B2
    d. Updates the enhanced status in Supabase
@@ -24,73 +24,35 @@ Dependencies:
 """
 
 import os
-import json
-import time
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 # Attempt to import utility functions, supporting both direct and main.py execution
 try:
     from utils.artifact_paths import (
         enhanced_image_path,
         enhanced_name_for_report,
-        layout_qa_path_for_enhanced_path,
     )
-    from utils.cloud_storage import get_b2_file_list
-    from utils.cloud_storage import download_file
-    from utils.cloud_storage import upload_file
-    from utils.cloud_storage import get_b2_report_filenames
-    from utils.db_utils import get_db_engine
+    from utils.directory_listing import directory_names
+    from utils.enhancement_jobs import fetch_and_enhance_report_job, fetch_report_pdf
     from utils.logging_config import configure_logging
-    from utils.report_layout import find_table3_page
-    from utils.table_enhancement import DEFAULT_PARAMS, enhance_table_lines_from_pdf_hq
-    import importlib.util
-    # Import the sync_enhanced_status function from 03a_SyncEnhancement.py
-    spec = importlib.util.spec_from_file_location("sync_module", "src/03a_SyncEnhancement.py")
-except ImportError:
-    from src.utils.artifact_paths import (
-        enhanced_image_path,
-        enhanced_name_for_report,
-        layout_qa_path_for_enhanced_path,
-    )
-    from src.utils.cloud_storage import get_b2_file_list
-    from src.utils.cloud_storage import download_file
-    from src.utils.cloud_storage import upload_file
-    from src.utils.cloud_storage import get_b2_report_filenames
-    from src.utils.db_utils import get_db_engine
-    from src.utils.logging_config import configure_logging
-    from src.utils.report_layout import find_table3_page
-    from src.utils.table_enhancement import DEFAULT_PARAMS, enhance_table_lines_from_pdf_hq
-    import importlib.util
-    # Import the sync_enhanced_status function from 03a_SyncEnhancement.py
-    spec = importlib.util.spec_from_file_location("sync_module", "src/03a_SyncEnhancement.py")
-    sync_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(sync_module)
-    sync_enhanced_status = sync_module.sync_enhanced_status
+    from utils.table_enhancement import check_opencv_build, enhance_report_job, init_enhancement_worker
+    from utils.sync_context import SyncContext, build_sync_context
 except ImportError:
     # This fallback is for when the script is run from the project root as part of main.py
     from src.utils.artifact_paths import (
         enhanced_image_path,
         enhanced_name_for_report,
-        layout_qa_path_for_enhanced_path,
     )
-    from src.utils.cloud_storage import get_b2_file_list
-    from src.utils.cloud_storage import download_file
-    from src.utils.cloud_storage import upload_file
-    from src.utils.cloud_storage import get_b2_report_filenames
-    from src.utils.db_utils import get_db_engine
+    from src.utils.directory_listing import directory_names
+    from src.utils.enhancement_jobs import fetch_and_enhance_report_job, fetch_report_pdf
     from src.utils.logging_config import configure_logging
-    from src.utils.report_layout import find_table3_page
-    from src.utils.table_enhancement import DEFAULT_PARAMS, enhance_table_lines_from_pdf_hq
-    import importlib.util
-    # Import the sync_enhanced_status function from 03_SyncEnhancement
-    spec = importlib.util.spec_from_file_location("sync_module", "src/03_SyncEnhancement.py")
-    sync_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(sync_module)
-    sync_enhanced_status = sync_module.sync_enhanced_status
+    from src.utils.table_enhancement import check_opencv_build, enhance_report_job, init_enhancement_worker
+    from src.utils.sync_context import SyncContext, build_sync_context
 
 # Configure logging
 configure_logging()
@@ -121,82 +83,23 @@ ENHANCED_FOLDER = BASE_DIR / 'data' / 'processed' / 'PDF'
 ENHANCED_FOLDER.mkdir(parents=True, exist_ok=True)
 RAW_FOLDER.mkdir(parents=True, exist_ok=True)
 
-# --- End Configuration -------------------------------------
-
-def write_layout_qa(layout_qa_path: Path, layout_result):
-    """Write the layout QA result beside an enhanced image artifact."""
-    layout_qa_path.parent.mkdir(parents=True, exist_ok=True)
-    with layout_qa_path.open("w", encoding="utf-8") as outfile:
-        json.dump(layout_result.to_dict(), outfile, indent=2, sort_keys=True)
-        outfile.write("\n")
-
-
-def enhance_report_pdf(pdf_path: Path, output_path: Path, year, week) -> bool:
-    """Run layout QA and then enhance a report PDF when Table 3 is located."""
-    layout_result = find_table3_page(
-        pdf_path,
-        default_page_index=DEFAULT_PARAMS["page_number"],
-        year=year,
-        week=week,
-    )
-    layout_qa_path = layout_qa_path_for_enhanced_path(output_path)
-    write_layout_qa(layout_qa_path, layout_result)
-
-    logging.info(
-        "Layout QA for %s: status=%s confidence=%s selected_page=%s",
-        pdf_path.name,
-        layout_result.status,
-        layout_result.confidence,
-        layout_result.selected_page_number,
-    )
-    for warning in layout_result.warnings:
-        logging.warning(f"Layout QA warning for {pdf_path.name}: {warning}")
-
-    if layout_result.status == "fail":
-        for reason in layout_result.reasons:
-            logging.error(f"Layout QA failed for {pdf_path.name}: {reason}")
-        return False
-
-    enhancement_params = DEFAULT_PARAMS.copy()
-    enhancement_params["page_number"] = layout_result.selected_page_index
-    return enhance_table_lines_from_pdf_hq(
-        str(pdf_path),
-        str(output_path),
-        **enhancement_params,
-        year=year,
-        week=week,
-    )
+# Enhancement is CPU-bound and independent per report; 1 runs inline.
+ENHANCEMENT_WORKERS = int(os.environ.get("ENHANCEMENT_WORKERS", min(os.cpu_count() or 1, 4)))
+# Successful reports are marked enhanced in Supabase this many at a time.
+STATUS_BATCH_SIZE = 50
+# Optional cap on reports enhanced per run; the rest are picked up next run.
+ENHANCEMENT_BATCH_SIZE = int(os.environ.get("ENHANCEMENT_BATCH_SIZE", 0)) or None
+# Inline runs prefetch raw PDFs from B2 on this many threads.
+DOWNLOAD_THREADS = 4
 
-def download_file_from_b2(b2_key: str, destination: Path) -> Optional[Path]:
-    """Download a file from B2 to a local temporary directory.
-    
-    Args:
-        b2_key: The key of the file in B2
-        destination: The destination directory to download to
-        
-    Returns:
-        Path to the downloaded file, or None if download failed
-    """
-    b2_filename = os.path.basename(b2_key)
-    logging.info(f"Downloading {b2_filename} from B2 to {destination}")
-    try:
-        logging.info(f"b2 key is {b2_key}")
-        success = download_file(b2_key, str(destination))
-        if success:
-            logging.info(f"Successfully downloaded {b2_filename} from B2")
-            return None
-        else:
-            logging.error(f"Failed to download {b2_filename} from B2")
-            return None
-    except Exception as e:
-        logging.error(f"Error downloading {b2_filename} from B2: {e}")
-        return None
+# --- End Configuration -------------------------------------
 
-def get_reports_to_enhance(engine) -> List[Dict]:
+def get_reports_to_enhance(engine, batch_size: Optional[int] = None) -> List[Dict]:
     """Query Supabase for reports that need enhancement.
     
     Args:
         engine: SQLAlchemy engine for database connection
+        batch_size: Maximum number of reports to return, newest first; None for all
         
     Returns:
         List of dictionaries with report data
@@ -205,25 +108,18 @@ def get_reports_to_enhance(engine) -> List[Dict]:
         try:
             # Query for reports that have been downloaded but not enhanced
             stmt = text(f"""
-                SELECT id::text, new_name, year, week, compatible
+                SELECT id::text AS id, new_name, year, week, compatible
                 FROM \"{SUPABASE_TABLE_NAME}\"
                 WHERE {DOWNLOADED_CONDITION}
                 AND (enhanced = 'N' OR enhanced IS NULL)
                 AND {COMPATIBILITY_CONDITION}
                 AND {COMMON_YEAR_CONDITION}
                 ORDER BY year DESC, week DESC
+                {"LIMIT :batch_size" if batch_size else ""}
             """)
             
-            result = session.execute(stmt).fetchall()
-            reports = []
-            for row in result:
-                reports.append({
-                    'id': row[0],
-                    'new_name': row[1],
-                    'year': row[2],
-                    'week': row[3],
-                    'compatible': row[4]
-                })
+            result = session.execute(stmt, {'batch_size': batch_size} if batch_size else {})
+            reports = [dict(row) for row in result.mappings()]
             
             logging.info(f"Found {len(reports)} reports that need enhancement")
             return reports
@@ -259,76 +155,153 @@ def update_enhanced_status(engine, report_id: str, enhanced_name: str, status: s
             session.rollback()
             logging.error(f"Error updating enhanced status for report {report_id}: {e}")
 
-def process_reports_from_supabase():
-    """Main function to process and enhance Lassa fever report tables."""
+def update_enhanced_statuses(engine, updates: List[Tuple[str, str]], status: str = 'Y'):
+    """Update the enhanced status for many reports with one UPDATE per batch.
+
+    Args:
+        engine: SQLAlchemy engine for database connection
+        updates: ``(report_id, enhanced_name)`` pairs
+        status: Status to set ('Y' or 'N')
+    """
+    for start in range(0, len(updates), STATUS_BATCH_SIZE):
+        batch = updates[start:start + STATUS_BATCH_SIZE]
+        params = {'status': status}
+        values = []
+        for i, (report_id, enhanced_name) in enumerate(batch):
+            params[f'id_{i}'] = report_id
+            params[f'name_{i}'] = enhanced_name
+            values.append(f"(CAST(:id_{i} AS uuid), :name_{i})")
+        stmt = text(f"""
+            UPDATE \"{SUPABASE_TABLE_NAME}\" AS w
+            SET enhanced = :status, enhanced_name = v.enhanced_name
+            FROM (VALUES {', '.join(values)}) AS v(id, enhanced_name)
+            WHERE w.id = v.id
+        """)
+        with Session(engine) as session:
+            try:
+                session.execute(stmt, params)
+                session.commit()
+                logging.info(f"Updated enhanced status to {status} for {len(batch)} reports")
+                continue
+            except Exception as e:
+                session.rollback()
+                logging.error(f"Batch enhanced status update failed, retrying row by row: {e}")
+        for report_id, enhanced_name in batch:
+            update_enhanced_status(engine, report_id, enhanced_name, status)
+
+def run_enhancement_jobs(jobs: List[Dict], workers: int):
+    """Download and enhance reports, in a process pool when more than one worker is allowed.
+
+    Args:
+        jobs: Work items accepted by ``fetch_and_enhance_report_job``
+        workers: Maximum number of worker processes
+
+    Yields:
+        ``(job, success, error)`` tuples as each report finishes
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        # Single process: download ahead on threads while enhancing in order
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_THREADS) as downloader:
+            fetches = [downloader.submit(fetch_report_pdf, job) for job in jobs]
+            for job, fetch in zip(jobs, fetches):
+                error = fetch.result()
+                yield (job, False, error) if error else enhance_report_job(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=init_enhancement_worker) as executor:
+        futures = [executor.submit(fetch_and_enhance_report_job, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+def process_reports_from_supabase(ctx: Optional[SyncContext] = None):
+    """Main function to process and enhance Lassa fever report tables.
+
+    Args:
+        ctx: Shared sync context from main.py. Built here when run directly.
+    """
     logging.info("Starting Lassa fever report table enhancement process")
     
     # Connect to Supabase
-    engine = get_db_engine(DATABASE_URL)
-    if not engine:
-        logging.error("Failed to connect to Supabase. Check DATABASE_URL environment variable.")
-        return
+    if ctx is None:
+        ctx = build_sync_context(DATABASE_URL)
+        if ctx is None:
+            return
+    engine = ctx.engine
     
-    b2_pdfs = get_b2_report_filenames(B2_RAW_PREFIX, ".pdf")
+    b2_pdfs = ctx.b2_report_filenames(B2_RAW_PREFIX, ".pdf")
     
-    logging.info(f"File names in B2: {b2_pdfs}")
+    logging.info(f"Found {len(b2_pdfs)} raw PDFs in B2")
+    logging.debug("File names in B2: %s", b2_pdfs)
     
-    reports = get_reports_to_enhance(engine)
+    reports = get_reports_to_enhance(engine, ENHANCEMENT_BATCH_SIZE)
     if not reports:
         logging.info("No reports to enhance")
         return
     logging.info(f"Found {len(reports)} reports to enhance")
-    logging.info(f"Reports: {reports}")
+    logging.debug("Reports: %s", reports)
     
 
+    jobs = []
+    # One scandir per year folder instead of a stat per report
+    listings: Dict[Path, set] = {}
+    enhanced_updates: List[Tuple[str, str]] = []
     for report in reports:
-            report_id = report['id']
-            new_name = report['new_name']
-            year = report['year']
-            week = report['week']
-            enhanced_name = enhanced_name_for_report(new_name)
-            output_path = enhanced_image_path(ENHANCED_FOLDER, year, enhanced_name)
-            if not output_path:
-                logging.warning(f"Could not derive enhanced artifact path for report {report_id} ({new_name})")
-                continue
+        report_id = report['id']
+        new_name = report['new_name']
+        year = report['year']
+        week = report['week']
+        enhanced_name = enhanced_name_for_report(new_name)
+        output_path = enhanced_image_path(ENHANCED_FOLDER, year, enhanced_name)
+        if not output_path:
+            logging.warning(f"Could not derive enhanced artifact path for report {report_id} ({new_name})")
+            continue
+        if output_path.parent not in listings:
+            # First visit to this year folder: create it once, then list it
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            if output_path.exists():
-                logging.info(f"Enhanced image {enhanced_name} already exists in {output_path}")
-                update_enhanced_status(engine, report_id, enhanced_name)
-                continue
-            if (RAW_FOLDER / str(year) / new_name).exists():
-                logging.info(f"Report {new_name} already exists in {RAW_FOLDER / str(year) / new_name}")
-                try:
-                    logging.info(f"Enhancing {new_name} (Year: {year}, Week: {week})")
-                    upload_success = enhance_report_pdf(RAW_FOLDER / str(year) / new_name, output_path, year, week)
-                    if upload_success:
-                        update_enhanced_status(engine, report_id, enhanced_name)
-                        logging.info(f"Successfully enhanced {new_name} (Year: {year}, Week: {week})")
-                except Exception as e:
-                    logging.error(f"Error enhancing {new_name}: {e}")
-                    continue
-            elif new_name in b2_pdfs:
-                logging.info(f"Report {new_name} exists in B2, can be downloaded")
-                b2_key = f"{B2_RAW_PREFIX}{year}/{new_name}"
-                download_file_from_b2(b2_key, destination=f"{RAW_FOLDER}/{year}/{new_name}")
-                time.sleep(5)
-                try:
-                    logging.info(f"Enhancing {new_name} (Year: {year}, Week: {week})")
-                    upload_success = enhance_report_pdf(RAW_FOLDER / str(year) / new_name, output_path, year, week)
-                    if upload_success:
-                        update_enhanced_status(engine, report_id, enhanced_name)
-                        logging.info(f"Successfully enhanced {new_name} (Year: {year}, Week: {week})")
-                except Exception as e:
-                    logging.error(f"Error enhancing {new_name}: {e}")
-                    continue
-            else:
-                logging.info(f"Raw report {new_name} does not exist in B2 or locally")  
-                continue
-            
+        if output_path.name in directory_names(output_path.parent, listings):
+            logging.info(f"Enhanced image {enhanced_name} already exists in {output_path}")
+            enhanced_updates.append((report_id, enhanced_name))
+            continue
+        pdf_path = RAW_FOLDER / str(year) / new_name
+        b2_key = None
+        if new_name in directory_names(pdf_path.parent, listings):
+            logging.info(f"Report {new_name} already exists in {pdf_path}")
+        elif new_name in b2_pdfs:
+            # Downloaded by the worker, overlapping with other reports' enhancement
+            logging.info(f"Report {new_name} exists in B2, can be downloaded")
+            b2_key = f"{B2_RAW_PREFIX}{year}/{new_name}"
+        else:
+            logging.info(f"Raw report {new_name} does not exist in B2 or locally")  
+            continue
+        jobs.append({
+            'b2_key': b2_key,
+            'report_id': report_id,
+            'new_name': new_name,
+            'enhanced_name': enhanced_name,
+            'pdf_path': str(pdf_path),
+            'output_path': str(output_path),
+            'year': year,
+            'week': week,
+        })
+
+    logging.info(f"Enhancing {len(jobs)} reports with {ENHANCEMENT_WORKERS} worker(s)")
+    if jobs:
+        check_opencv_build()
+    for job, success, error in run_enhancement_jobs(jobs, ENHANCEMENT_WORKERS):
+        if error:
+            logging.error(f"Error enhancing {job['new_name']}: {error}")
+        elif success:
+            enhanced_updates.append((job['report_id'], job['enhanced_name']))
+            logging.info(f"Successfully enhanced {job['new_name']} (Year: {job['year']}, Week: {job['week']})")
+            if len(enhanced_updates) >= STATUS_BATCH_SIZE:
+                update_enhanced_statuses(engine, enhanced_updates)
+                enhanced_updates = []
+    update_enhanced_statuses(engine, enhanced_updates)
+
     logging.info("Finished processing reports")
 
-def main():
-    process_reports_from_supabase()
+def main(ctx: Optional[SyncContext] = None):
+    process_reports_from_supabase(ctx)
 
 if __name__ == "__main__":
     main()
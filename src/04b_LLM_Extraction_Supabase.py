@@ -22,6 +22,8 @@ Outputs:
 
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from sqlalchemy import text
@@ -47,14 +49,15 @@ try:
         layout_qa_path_for_enhanced_path,
     )
     from utils.gemini_extractor import (
-        extract_table_with_gemini, parse_gemini_response,
+        GEMINI_CONCURRENCY, extract_table_with_gemini, load_image_part, parse_gemini_response,
         log_extraction_differences, save_extracted_data_to_csv)
     from utils.csv_qa import validate_extracted_csv
+    from utils.directory_listing import file_exists, list_directory_names
     from utils.extraction_qa import (
         read_extracted_csv_rows,
         write_extraction_qa,
     )
-    from utils.extraction_validation import validate_extraction_results
+    from utils.extraction_validation import validate_latest_extractions
     from utils.cloud_storage import download_file, get_b2_report_filenames
     from utils.db_utils import get_db_engine
     from utils.review_needed import record_review_needed
@@ -68,14 +71,15 @@ except ImportError:
         layout_qa_path_for_enhanced_path,
     )
     from src.utils.gemini_extractor import (
-        extract_table_with_gemini, parse_gemini_response,
+        GEMINI_CONCURRENCY, extract_table_with_gemini, load_image_part, parse_gemini_response,
         log_extraction_differences, save_extracted_data_to_csv)
     from src.utils.csv_qa import validate_extracted_csv
+    from src.utils.directory_listing import file_exists, list_directory_names
     from src.utils.extraction_qa import (
         read_extracted_csv_rows,
         write_extraction_qa,
     )
-    from src.utils.extraction_validation import validate_extraction_results
+    from src.utils.extraction_validation import validate_latest_extractions
     from src.utils.cloud_storage import download_file, get_b2_report_filenames
     from src.utils.db_utils import get_db_engine
     from src.utils.review_needed import record_review_needed
@@ -93,6 +97,9 @@ CSV_BASE_FOLDER = BASE_DIR / 'data' / 'processed' / 'CSV'
 SUPABASE_TABLE_NAME = 'website_data'
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# differing_outputs.txt is shared by every report of a year
+_DIFF_LOG_LOCK = threading.Lock()
+
 fieldnames_table = [
                 "States", "Suspected", "Confirmed",
                 "Probable", "HCW", "Deaths"
@@ -131,18 +138,9 @@ def get_reports_to_process(engine):
                     year, week
             """)
             
-            result = session.execute(stmt)
+            # Eligibility is filtered in SQL; rows arrive as ready-made dicts
+            reports = [dict(row) for row in session.execute(stmt).mappings()]
             
-            for row in result:
-                report_data = {
-                    'id': row.id,
-                    'year': row.year,
-                    'week': row.week,
-                    'new_name': row.new_name,
-                    'enhanced_name': row.enhanced_name
-                }
-                reports.append(report_data)
-                
             logging.info(f"Found {len(reports)} reports needing extraction")
             
         except Exception as e:
@@ -151,13 +149,14 @@ def get_reports_to_process(engine):
     return reports
 
 
-def get_enhanced_image(enhanced_name, year):
+def get_enhanced_image(enhanced_name, year, listings=None):
     """
     Check if enhanced image exists locally, otherwise download from B2.
     
     Args:
         enhanced_name: Name of the enhanced image
         year: Year of the report
+        listings: Optional directory listings from list_directory_names
         
     Returns:
         Path to the enhanced image or None if not available
@@ -171,7 +170,7 @@ def get_enhanced_image(enhanced_name, year):
         logging.warning(f"Could not derive enhanced image path for {enhanced_name}")
         return None
     
-    if local_path.exists():
+    if file_exists(local_path, listings):
         logging.info(f"Found enhanced image locally: {local_path}")
         return local_path
         
@@ -240,7 +239,30 @@ def _record_extraction_review(report_id, year, week, artifact_name, check_type,
     )
 
 
-def process_single_report(report_metadata, model_name, engine):
+def _extract_responses(input_path, model_name, count, image_part=None):
+    """
+    Run ``count`` extractions for an image concurrently.
+
+    Args:
+        input_path: Path to the enhanced image
+        model_name: Name of the Gemini model to use
+        count: Number of independent extractions
+        image_part: Image loaded once with load_image_part, shared by every call
+
+    Returns:
+        List of (success, response) tuples from extract_table_with_gemini
+    """
+    if count == 1:
+        return [extract_table_with_gemini(image_path=str(input_path), model_name=model_name, image_part=image_part)]
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        futures = [
+            pool.submit(extract_table_with_gemini, image_path=str(input_path), model_name=model_name, image_part=image_part)
+            for _ in range(count)
+        ]
+        return [future.result() for future in futures]
+
+
+def process_single_report(report_metadata, model_name, engine, listings=None):
     """
     Process a single Lassa fever report.
     
@@ -248,6 +270,7 @@ def process_single_report(report_metadata, model_name, engine):
         report_metadata (dict): Dictionary containing report metadata
         model_name (str): Name of the Gemini model to use
         engine: SQLAlchemy engine for database connection
+        listings (dict, optional): Directory listings from list_directory_names
         
     Returns:
         bool: True if processing was successful, False otherwise
@@ -273,16 +296,17 @@ def process_single_report(report_metadata, model_name, engine):
         _record_extraction_review(report_id, year, week, enhanced_name, "artifact_path", reason)
         return False
 
-    # Output folder for CSV files
+    # Output folder for CSV files; folders in the run's listings were created up front
     output_dir = output_path.parent
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if listings is None or output_dir not in listings:
+        output_dir.mkdir(parents=True, exist_ok=True)
     
     # Output CSV filename
     base_filename = Path(csv_name).stem
     extraction_qa_path = extraction_qa_path_for_csv_path(output_path)
     
     # Check if output file already exists
-    if output_path.exists():
+    if file_exists(output_path, listings):
         logging.info(f"Found existing processed file: {base_filename}.csv")
 
         expected_year = f"20{year}" if len(str(year)) == 2 else str(year)
@@ -323,7 +347,7 @@ def process_single_report(report_metadata, model_name, engine):
         return True
     
     # Get enhanced image - checks locally first, then downloads from B2 if needed
-    input_path = get_enhanced_image(enhanced_name, year)
+    input_path = get_enhanced_image(enhanced_name, year, listings)
     if not input_path:
         reason = f"Enhanced image not available: {enhanced_name}"
         logging.warning(reason)
@@ -336,42 +360,34 @@ def process_single_report(report_metadata, model_name, engine):
         # Process the image with retry logic
         max_attempts = 3  # Maximum number of attempts to get matching outputs
         attempt = 1
+        parsed_outputs = []  # Parsed outputs kept across attempts
+        image_part = load_image_part(input_path)  # Read once for every call below
         
         while attempt <= max_attempts:
-            # Extract table data twice for validation
-            responses = []
-            for i in range(2):
-                success, response = extract_table_with_gemini(
-                    image_path=str(input_path),
-                    model_name=model_name
-                )
-                if success:
-                    responses.append(response)
-                else:
+            # Extract twice at first; retries only add what is needed for a new pair,
+            # which is compared against every earlier output
+            new_count = 0
+            for i, (success, response) in enumerate(
+                _extract_responses(input_path, model_name, max(1, 2 - len(parsed_outputs)), image_part)
+            ):
+                if not success:
                     logging.warning(f"Failed to extract data: {response}")
-            
-            if len(responses) < 2:
-                logging.warning(f"Failed to get two valid responses. Attempt {attempt}/{max_attempts}")
-                attempt += 1
-                continue
-            
-            # Parse responses
-            parsed_data = []
-            for i, response in enumerate(responses):
+                    continue
                 success, data = parse_gemini_response(response)
                 if success:
-                    parsed_data.append(data)
+                    parsed_outputs.append(data)
+                    new_count += 1
                 else:
                     logging.warning(f"Failed to parse response {i+1}: {data}")
             
-            if len(parsed_data) < 2:
-                logging.warning(f"Failed to parse two valid responses. Attempt {attempt}/{max_attempts}")
+            if new_count == 0 or len(parsed_outputs) < 2:
+                logging.warning(f"Failed to get two parsed responses. Attempt {attempt}/{max_attempts}")
                 attempt += 1
                 continue
             
             # Validate the extraction results
-            validation_result = validate_extraction_results(
-                parsed_data, enhanced_name, attempt, max_attempts
+            validation_result = validate_latest_extractions(
+                parsed_outputs, new_count, enhanced_name, attempt, max_attempts
             )
 
             for warning in validation_result.warnings:
@@ -431,14 +447,15 @@ def process_single_report(report_metadata, model_name, engine):
                 
                 # Record differences to a text file in the output directory
                 diff_file = output_dir / "differing_outputs.txt"
-                log_extraction_differences(
-                    diff_file,
-                    enhanced_name,
-                    attempt,
-                    max_attempts,
-                    validation_result.normalized_1,
-                    validation_result.normalized_2,
-                )
+                with _DIFF_LOG_LOCK:
+                    log_extraction_differences(
+                        diff_file,
+                        enhanced_name,
+                        attempt,
+                        max_attempts,
+                        validation_result.normalized_1,
+                        validation_result.normalized_2,
+                    )
 
             if validation_result.status == "retry":
                 attempt += 1
@@ -468,6 +485,45 @@ def process_single_report(report_metadata, model_name, engine):
         _record_extraction_review(report_id, year, week, enhanced_name, "extraction_exception", reason)
         return False
 
+def run_extraction_jobs(reports, model_name, engine, workers=GEMINI_CONCURRENCY, listings=None):
+    """
+    Extract reports on a thread pool; the work is waiting on the Gemini API.
+
+    Args:
+        reports (list): Report metadata dicts from get_reports_to_process
+        model_name (str): Name of the Gemini model to use
+        engine: SQLAlchemy engine for database connection
+        workers (int): Maximum number of reports in flight
+        listings (dict, optional): Directory listings from list_directory_names
+
+    Yields:
+        (report, success) tuples as each report finishes
+    """
+    logging.info(f"Extracting {len(reports)} reports with up to {workers} in flight")
+    if workers <= 1 or len(reports) <= 1:
+        for report in reports:
+            yield report, process_single_report(report, model_name, engine, listings)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(reports))) as executor:
+        futures = {
+            executor.submit(process_single_report, report, model_name, engine, listings): report
+            for report in reports
+        }
+        for future in as_completed(futures):
+            report = futures[future]
+            try:
+                success = future.result()
+            except Exception as e:
+                reason = f"Error processing {report.get('enhanced_name')}: {e}"
+                logging.error(reason)
+                _record_extraction_review(
+                    report['id'], report['year'], report['week'], report.get('enhanced_name'),
+                    "extraction_exception", reason,
+                )
+                success = False
+            yield report, success
+
 def process_reports_from_supabase(model_name="gemini-2.0-flash"):
     """
     Process Lassa fever reports based on metadata from Supabase.
@@ -499,10 +555,23 @@ def process_reports_from_supabase(model_name="gemini-2.0-flash"):
         logging.info("No reports to process")
         return
     
-    # Process each report
+    # List CSV and enhanced image folders once per year instead of a stat per report
+    artifact_paths = [
+        path
+        for report in reports
+        for path in (
+            enhanced_image_path(ENHANCED_FOLDER, report['year'], report['enhanced_name']),
+            csv_path(CSV_BASE_FOLDER, report['year'], csv_name_for_enhanced(report['enhanced_name'])),
+        )
+        if path
+    ]
+    listings = list_directory_names({path.parent for path in artifact_paths})
+    for csv_dir in {path.parent for path in artifact_paths if path.suffix == ".csv"}:
+        csv_dir.mkdir(parents=True, exist_ok=True)
+
+    # Process reports concurrently
     processed_count = 0
-    for report in reports:
-        success = process_single_report(report, model_name, engine)
+    for _, success in run_extraction_jobs(reports, model_name, engine, listings=listings):
         if success:
             processed_count += 1
     
@@ -47,8 +47,10 @@ sys.path.insert(0, str(project_root))
 
 # Import centralized logging configuration
 try:
+    from utils.atomic_write import atomic_write_path
     from utils.logging_config import configure_logging
 except ImportError:
+    from src.utils.atomic_write import atomic_write_path
     from src.utils.logging_config import configure_logging
 
 # Configure logging
@@ -74,6 +76,28 @@ def connect_to_database():
         logging.error(f"Failed to connect to database: {e}")
         sys.exit(1)
 
+def write_text_if_changed(path, content):
+    """
+    Atomically replace a text file, skipping the write if content is unchanged.
+
+    The content is written through atomic_write_path, so an interrupted run
+    never leaves a truncated CSV behind.
+
+    Args:
+        path (Path): Destination file
+        content (str): Full file content
+
+    Returns:
+        bool: True if the file was written, False if it already matched
+    """
+    path = Path(path)
+    if path.exists() and path.read_text(encoding='utf-8') == content:
+        return False
+    with atomic_write_path(path) as part_path:
+        with open(part_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+    return True
+
 def export_data_to_csv(engine, output_dir):
     """
     Export data from the lassa_data table to CSV files.
@@ -118,12 +142,16 @@ def export_data_to_csv(engine, output_dir):
         timestamp = datetime.now().strftime("%Y%m%d")
         timestamped_path = output_dir / f"lassa_data_{timestamp}.csv"
         
-        # Export to CSV files
-        df.to_csv(latest_path, index=False)
-        df.to_csv(timestamped_path, index=False)
-        
-        logging.info(f"Exported {len(df)} records to {latest_path}")
-        logging.info(f"Created timestamped backup at {timestamped_path}")
+        # Serialize once and reuse the text for both files
+        csv_text = df.to_csv(index=False)
+        if write_text_if_changed(latest_path, csv_text):
+            logging.info(f"Exported {len(df)} records to {latest_path}")
+        else:
+            logging.info(f"{latest_path} already matches the {len(df)} exported records; left unchanged")
+        if write_text_if_changed(timestamped_path, csv_text):
+            logging.info(f"Created timestamped backup at {timestamped_path}")
+        else:
+            logging.info(f"Timestamped backup {timestamped_path} already matches the export; left unchanged")
         
         # Also create a README file in the exports directory
         readme_path = output_dir / "README.md"
@@ -0,0 +1,36 @@
+"""
+Atomic file replacement for pipeline outputs.
+
+Later runs skip work whose output file already exists, so a download or CSV cut
+short by an interrupted run must never be left at the final path. Writers fill a
+``.part`` sibling instead, which is moved into place only once it is complete.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+PART_SUFFIX = ".part"
+
+
+@contextmanager
+def atomic_write_path(path):
+    """
+    Yield a temporary sibling of ``path`` to write to, then move it into place.
+
+    The temporary file replaces ``path`` with os.replace only if the block exits
+    without raising; it is removed in every case, so no partial file survives.
+
+    Args:
+        path (str | Path): Final destination of the file
+
+    Yields:
+        Path: Temporary path to write the complete file to
+    """
+    path = Path(path)
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    try:
+        yield part_path
+        os.replace(part_path, path)
+    finally:
+        part_path.unlink(missing_ok=True)
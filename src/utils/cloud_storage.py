@@ -13,6 +13,11 @@ from b2sdk.v2 import InMemoryAccountInfo, B2Api
 from b2sdk.v2.exception import B2Error
 from typing import Set
 
+try:
+    from utils.atomic_write import atomic_write_path
+except ImportError:
+    from src.utils.atomic_write import atomic_write_path
+
 def get_b2_api():
     """
     Create and return a B2 API client using environment variables.
@@ -60,6 +65,30 @@ def get_b2_file_list() -> Set[str]:
         logging.error(f"Error retrieving file list from B2: {e}")
         return set()
 
+def filter_b2_report_filenames(all_b2_files, prefix: str, extension: str) -> Set[str]:
+    """
+    Filter a full B2 listing down to filenames under a prefix with an extension.
+
+    Args:
+        all_b2_files: Iterable of full B2 file paths.
+        prefix (str): The prefix to filter files by.
+        extension (str): The file extension to filter files by.
+
+    Returns:
+        Set[str]: A set of basenames matching the prefix and extension.
+    """
+    report_filenames = set()
+    for b2_file_path in all_b2_files:
+        if b2_file_path.startswith(prefix):
+            # Extract the filename part after the prefix
+            filename = os.path.basename(b2_file_path)
+            if filename and filename.endswith(extension):
+                report_filenames.add(filename)
+    logging.info(f"Found {len(report_filenames)} files in B2 under the prefix '{prefix}'.")
+    if not report_filenames:
+        logging.warning(f"No files found in B2 under prefix '{prefix}'. Check prefix and bucket content.")
+    return report_filenames
+
 def get_b2_report_filenames(prefix: str, extension: str) -> Set[str]:
     """
     Retrieves a set of unique filenames from the B2 bucket,
@@ -76,18 +105,7 @@ def get_b2_report_filenames(prefix: str, extension: str) -> Set[str]:
     logging.info(f"Fetching file list from B2 under prefix: '{prefix}'")
     try:
         all_b2_files = get_b2_file_list() # This gets all files in the bucket
-        report_filenames = set()
-        for b2_file_path in all_b2_files:
-            if b2_file_path.startswith(prefix):
-                # Extract the filename part after the prefix
-                filename = os.path.basename(b2_file_path)
-                # Ensure we only add non-empty filenames, that are likely PDFs
-                if filename and filename.endswith(extension):
-                    report_filenames.add(filename)
-        logging.info(f"Found {len(report_filenames)} files in B2 under the prefix '{prefix}'.")
-        if not report_filenames:
-            logging.warning(f"No files found in B2 under prefix '{prefix}'. Check prefix and bucket content.")
-        return report_filenames
+        return filter_b2_report_filenames(all_b2_files, prefix, extension)
     except Exception as e:
         logging.error(f"Error fetching or processing B2 file list: {e}")
         return set() # Return empty set on error
@@ -245,7 +263,10 @@ def download_file(b2_key, local_path, bucket=None):
         # The B2 SDK doesn't support the download_dest parameter directly
         # Instead, we need to use the download_file_to method
         download_dest = bucket_obj.download_file_by_name(file_name=b2_key)
-        download_dest.save_to(str(local_path))
+        # An interrupted transfer never leaves a truncated file that later runs
+        # would treat as already present
+        with atomic_write_path(local_path) as part_path:
+            download_dest.save_to(str(part_path))
         
         logging.info(f"Successfully downloaded b2://{bucket}/{b2_key} to {local_path}")
         return True
@@ -5,7 +5,6 @@ This module provides functions to validate, normalize, and transform
 tabular data extracted from Lassa fever reports.
 """
 
-import copy
 import logging
 import uuid
 import pandas as pd
@@ -54,69 +53,59 @@ def sort_table_rows(table_rows):
     Returns:
         list: Sorted list of dictionaries
     """
-    # Identify the Total row (assumes the Total row has a "States" value equal to "Total")
-    total_rows = [row for row in table_rows if row.get("States", "").strip().lower() == "total"]
-
-    # For the rest, filter out rows where 'States' is blank or only whitespace, skip "Total",
-    # and remove rows where every key except 'States' is blank.
-    non_total_rows = [
-        row for row in table_rows 
-        if row.get("States", "").strip() and row.get("States", "").strip().lower() != "total"
-        and any(str(row.get(k, "")).strip() for k in row if k != "States")
-    ]
-    
-    # Sort non-total rows alphabetically by the 'States' field (case-insensitive)
-    sorted_rows = sorted(non_total_rows, key=lambda x: x["States"].strip().lower())
+    total_rows = []
+    keyed_rows = []
+    for row in table_rows:
+        # Strip and lowercase each state once; the result is also the sort key
+        state_key = row.get("States", "").strip().lower()
+        if state_key == "total":
+            # Identify the Total row (assumes the Total row has a "States" value equal to "Total")
+            total_rows.append(row)
+        elif state_key and any(str(row.get(k, "")).strip() for k in row if k != "States"):
+            # Skip blank states and rows where every key except 'States' is blank
+            keyed_rows.append((state_key, len(keyed_rows), row))
+
+    # Sort non-total rows alphabetically by the 'States' field (case-insensitive);
+    # the index keeps ties in input order without comparing dicts
+    keyed_rows.sort()
+    sorted_rows = [row for _, _, row in keyed_rows]
     
     # Append the Total row at the end if it exists (even if other fields are blank)
-    if total_rows:
-        sorted_rows.extend(total_rows)
+    sorted_rows.extend(total_rows)
     return sorted_rows
 
 
-def normalize_state_names(rows):
+# Columns compared between extraction outputs; HCW and Probable are ignored
+COMPARISON_COLUMNS = ("States", "Suspected", "Confirmed", "Deaths")
+
+
+def normalize_state_row(row):
     """
-    Convert all state names to lowercase and replace hyphens with spaces.
-    This function returns a new list of dictionaries without modifying the originals.
-    
+    Return a copy of one row with its state name lowercased and hyphens replaced by spaces.
+
     Args:
-        rows (list): List of dictionaries representing table rows
-        
+        row (dict): Dictionary representing a table row
+
     Returns:
-        list: List of dictionaries with normalized state names
+        dict: New dictionary with a normalized state name
     """
-    new_rows = []
-    for row in rows:
-        new_row = row.copy()
-        if "States" in new_row and new_row["States"]:
-            new_row["States"] = new_row["States"].lower().replace("-", " ")
-        new_rows.append(new_row)
-    return new_rows
+    new_row = row.copy()
+    if new_row.get("States"):
+        new_row["States"] = new_row["States"].lower().replace("-", " ")
+    return new_row
 
 
-def filter_comparison_columns(rows):
+def comparison_columns_row(row):
     """
-    Filter out columns that are not relevant for comparison (HCW and Probable).
-    Only keep States, Suspected, Confirmed, and Deaths for comparison purposes.
-    Returns a new list of dictionaries without modifying the originals.
-    
+    Return a new dictionary holding only the COMPARISON_COLUMNS present in ``row``.
+
     Args:
-        rows (list): List of dictionaries representing table rows
-        
+        row (dict): Dictionary representing a table row
+
     Returns:
-        list: List of dictionaries with only relevant columns
+        dict: Dictionary with only the comparison columns
     """
-    relevant_columns = ["States", "Suspected", "Confirmed", "Deaths"]
-    filtered_rows = []
-    
-    for row in rows:
-        filtered_row = {}
-        for column in relevant_columns:
-            if column in row:
-                filtered_row[column] = row[column]
-        filtered_rows.append(filtered_row)
-
-    return filtered_rows
+    return {column: row[column] for column in COMPARISON_COLUMNS if column in row}
 
 
 def validate_logical_consistency(rows):
@@ -138,7 +127,8 @@ def validate_logical_consistency(rows):
     """
     is_valid = True
     error_messages = []
-    validated_rows = copy.deepcopy(rows)
+    # Row values are flat strings, so shallow row copies keep the input untouched
+    validated_rows = [row.copy() for row in rows]
     
     for i, row in enumerate(validated_rows):
         # Skip rows without a state name or the "Total" row for validation
@@ -0,0 +1,53 @@
+"""
+Cached directory listings for per-report artifact existence checks.
+
+Pipeline stages check one or two artifacts per report, and most reports share a
+year folder, so listing each folder once with ``os.scandir`` replaces a stat per
+report with a set lookup.
+"""
+
+import os
+
+
+def directory_names(directory, listings):
+    """
+    Return the file names in ``directory``, listing each directory once.
+
+    Args:
+        directory: Directory to list
+        listings: Per-run cache of directory listings, updated in place
+
+    Returns:
+        Set of entry names; empty if the directory does not exist
+    """
+    if directory not in listings:
+        try:
+            with os.scandir(directory) as entries:
+                listings[directory] = {entry.name for entry in entries}
+        except FileNotFoundError:
+            listings[directory] = set()
+    return listings[directory]
+
+
+def list_directory_names(directories):
+    """
+    List each directory up front, e.g. before handing listings to worker threads.
+
+    Args:
+        directories: Directories to list
+
+    Returns:
+        Dict mapping each directory to the set of entry names in it; missing
+        directories map to an empty set
+    """
+    listings = {}
+    for directory in directories:
+        directory_names(directory, listings)
+    return listings
+
+
+def file_exists(path, listings):
+    """Check ``path`` against a pre-built listing, falling back to a stat."""
+    if listings is not None and path.parent in listings:
+        return path.name in listings[path.parent]
+    return path.exists()
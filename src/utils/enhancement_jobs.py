@@ -0,0 +1,58 @@
+"""
+Process-pool entry point for the table enhancement stage.
+
+Workers fetch their own raw PDF from B2 before enhancing it, so downloads for
+some reports overlap with PyMuPDF/OpenCV work on others. Kept apart from
+table_enhancement, which stays free of B2 side effects, and importable by
+name so jobs can be pickled under any multiprocessing start method.
+"""
+
+from pathlib import Path
+
+try:
+    from utils.cloud_storage import download_file
+    from utils.table_enhancement import enhance_report_job
+except ImportError:
+    from src.utils.cloud_storage import download_file
+    from src.utils.table_enhancement import enhance_report_job
+
+
+def fetch_report_pdf(job):
+    """
+    Download a report's raw PDF to ``pdf_path`` if the job carries a ``b2_key``.
+
+    Args:
+        job: Enhancement job dict.
+
+    Returns:
+        None when the PDF is in place, otherwise an error message. Never raises.
+    """
+    b2_key = job.get("b2_key")
+    if not b2_key:
+        return None
+    # Downloads land atomically, so a non-empty file is complete (e.g. a retry)
+    pdf_path = Path(job["pdf_path"])
+    if pdf_path.is_file() and pdf_path.stat().st_size > 0:
+        return None
+    try:
+        downloaded = download_file(b2_key, job["pdf_path"])
+    except Exception as e:
+        return f"Download of {b2_key} failed: {e}"
+    return None if downloaded else f"Download of {b2_key} failed"
+
+
+def fetch_and_enhance_report_job(job):
+    """
+    Download a report's raw PDF if the job asks for it, then enhance it.
+
+    Args:
+        job: Dict accepted by ``enhance_report_job``, optionally with a
+            ``b2_key`` naming the raw PDF to download to ``pdf_path`` first.
+
+    Returns:
+        Tuple of (job, success, error message or None). Never raises.
+    """
+    error = fetch_report_pdf(job)
+    if error:
+        return job, False, error
+    return enhance_report_job(job)
@@ -10,15 +10,15 @@ from typing import Literal, Optional
 
 try:
     from utils.data_validation import (
-        filter_comparison_columns,
-        normalize_state_names,
+        comparison_columns_row,
+        normalize_state_row,
         sort_table_rows,
         validate_logical_consistency,
     )
 except ImportError:
     from src.utils.data_validation import (
-        filter_comparison_columns,
-        normalize_state_names,
+        comparison_columns_row,
+        normalize_state_row,
         sort_table_rows,
         validate_logical_consistency,
     )
@@ -40,10 +40,14 @@ class ExtractionValidationResult:
 
 
 def _comparison_rows(rows):
-    sorted_rows = sort_table_rows(rows)
-    normalized_rows = normalize_state_names(sorted_rows)
-    comparison_rows = filter_comparison_columns(normalized_rows)
-    return normalized_rows, comparison_rows
+    """
+    Sort rows, then normalize state names and keep the comparison columns in one pass.
+
+    Normalized rows feed the differences log; comparison rows hold only
+    COMPARISON_COLUMNS and decide whether two outputs agree.
+    """
+    normalized_rows = [normalize_state_row(row) for row in sort_table_rows(rows)]
+    return normalized_rows, [comparison_columns_row(row) for row in normalized_rows]
 
 
 def _parse_int(value):
@@ -193,3 +197,37 @@ def validate_extraction_results(parsed_data, enhanced_name, attempt, max_attempt
         errors=errors,
         warnings=[f"Outputs differ on comparison columns for {enhanced_name}."],
     )
+
+
+def validate_latest_extractions(parsed_outputs, new_count, enhanced_name, attempt, max_attempts):
+    """
+    Validate the newest parsed outputs against every output kept so far.
+
+    Retries add a single extraction instead of a fresh pair, so each new output
+    is paired with every earlier one and any pair that validates is accepted.
+
+    Args:
+        parsed_outputs (list): Parsed outputs from all attempts, oldest first
+        new_count (int): Number of outputs at the end of the list from this attempt
+        enhanced_name (str): Name of the enhanced image, for messages
+        attempt (int): Current attempt number
+        max_attempts (int): Maximum number of attempts
+
+    Returns:
+        The first passing ExtractionValidationResult, newest pairs first; otherwise
+        the result for the two newest outputs
+    """
+    if len(parsed_outputs) < 2:
+        return validate_extraction_results(parsed_outputs, enhanced_name, attempt, max_attempts)
+
+    newest = None
+    for j in range(len(parsed_outputs) - 1, len(parsed_outputs) - 1 - new_count, -1):
+        for i in range(j - 1, -1, -1):
+            result = validate_extraction_results(
+                [parsed_outputs[i], parsed_outputs[j]], enhanced_name, attempt, max_attempts
+            )
+            if result.status == "pass":
+                return result
+            if newest is None:
+                newest = result
+    return newest
@@ -6,19 +6,52 @@ for extracting tabular data from images of Lassa fever reports.
 """
 
 import logging
+import mimetypes
 import os
 from pathlib import Path
+import httpx
 from dotenv import load_dotenv
 from google import genai
-from PIL import Image
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from google.genai import types
 
 # Utility modules should use logging but not configure it - configuration is done in main scripts
 
+try:
+    from utils.atomic_write import atomic_write_path
+    from utils.rate_limiter import RateLimiter
+except ImportError:
+    from src.utils.atomic_write import atomic_write_path
+    from src.utils.rate_limiter import RateLimiter
+
 # Initialize the Gemini client with API key
 load_dotenv()
-client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+
+# Reports extracted at once by the LLM extraction stage. Each report keeps its two
+# Gemini calls in flight together, so up to twice this many requests can be open.
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY") or 8)
+
+# The client keeps one httpx connection pool for the whole run. httpx keeps at most
+# 20 idle connections (100 total) by default, so above 10 concurrent reports extra
+# connections would be closed after use and reopened with a fresh TLS handshake.
+# The limits never go below httpx's defaults; at the default concurrency of 8 they
+# are exactly those defaults and this only matters when GEMINI_CONCURRENCY > 10.
+# HttpOptions.client_args is available from google-genai 1.12.1, the pinned floor.
+client = genai.Client(
+    api_key=os.getenv("GOOGLE_API_KEY"),
+    http_options=types.HttpOptions(
+        client_args={
+            "limits": httpx.Limits(
+                max_connections=max(100, 2 * GEMINI_CONCURRENCY),
+                max_keepalive_connections=max(20, 2 * GEMINI_CONCURRENCY),
+            )
+        }
+    ),
+)
+
+# Requests per minute allowed by the API key's quota; unset or 0 leaves requests unpaced
+GEMINI_RPM = int(os.getenv("GEMINI_RPM") or 0)
+request_limiter = RateLimiter(GEMINI_RPM) if GEMINI_RPM > 0 else None
 
 # Define the Pydantic model for one row of the table
 class TableRow(BaseModel):
@@ -30,6 +63,9 @@ class TableRow(BaseModel):
     HCW: str = Field(..., alias="HCW")
     Deaths: str = Field(..., alias="Deaths")
 
+# Dumps a whole parsed table in one pydantic-core call
+TABLE_ROWS_ADAPTER = TypeAdapter(list[TableRow])
+
 # Import the prompt template with appropriate error handling
 try:
     from prompts.table_extraction_prompt import TABLE_EXTRACTION_PROMPT
@@ -40,20 +76,42 @@ except ImportError:
 prompt_template = TABLE_EXTRACTION_PROMPT
 
 
-def extract_table_with_gemini(image_path, model_name):
+def load_image_part(image_path):
+    """
+    Read an image file into an inline Gemini content part.
+
+    The file's bytes are sent as-is. Passing a PIL image instead makes the SDK
+    decode and re-encode the PNG on every request.
+
+    Args:
+        image_path (Path): Path to the image file
+
+    Returns:
+        types.Part: Inline image part, reusable across requests
+    """
+    mime_type = mimetypes.guess_type(str(image_path))[0] or "image/png"
+    return types.Part.from_bytes(data=Path(image_path).read_bytes(), mime_type=mime_type)
+
+
+def extract_table_with_gemini(image_path, model_name, image_part=None):
     """
     Extract table data from an image using the Gemini API.
     
     Args:
         image_path (Path): Path to the image file
         model_name (str): Name of the Gemini model to use
+        image_part (types.Part, optional): Image already loaded with load_image_part;
+            read from image_path when omitted
         
     Returns:
         tuple: (success, response) where success is a boolean and response is either the API response or an error message
     """
     try:
-        # Open the image
-        image = Image.open(image_path)
+        image = image_part if image_part is not None else load_image_part(image_path)
+
+        # Wait for a slot under the shared RPM quota before calling the API
+        if request_limiter is not None:
+            request_limiter.acquire()
         
         # Call the Gemini API
         if model_name == "gemini-2.0-flash":
@@ -100,7 +158,8 @@ def parse_gemini_response(response):
         table_rows = getattr(response, "parsed", None)
         if table_rows is None:
             return False, "Gemini API response has no 'parsed' data."
-        dict_rows = [row.model_dump(by_alias=True) for row in table_rows]
+        # warnings="error" rejects anything the SDK did not parse into TableRow
+        dict_rows = TABLE_ROWS_ADAPTER.dump_python(table_rows, by_alias=True, warnings="error")
         return True, dict_rows
     except Exception as e:
         return False, f"Exception during parsing: {str(e)}"
@@ -172,25 +231,30 @@ def save_extracted_data_to_csv(data, output_path, fieldnames, year=None, week=No
             )
         ]
         
-        # Write the filtered data to CSV
-        with open(output_path, mode="w", newline="", encoding="utf-8") as csvfile:
-            # Add Year and Week to fieldnames if provided
-            if year is not None and 'Year' not in fieldnames:
-                fieldnames = ['Year'] + fieldnames
-            if week is not None and 'Week' not in fieldnames:
-                fieldnames = ['Week'] + fieldnames
+        # Write the filtered data to CSV; an interrupted run never leaves a
+        # truncated CSV that later runs would treat as already extracted
+        with atomic_write_path(output_path) as part_path:
+            with open(part_path, mode="w", newline="", encoding="utf-8") as csvfile:
+                # Add Year and Week to fieldnames if provided
+                if year is not None and 'Year' not in fieldnames:
+                    fieldnames = ['Year'] + fieldnames
+                if week is not None and 'Week' not in fieldnames:
+                    fieldnames = ['Week'] + fieldnames
                 
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for table_row in filtered_rows:
                 # Remove any internal fields and add Year/Week
-                csv_row = {k: v for k, v in table_row.items() if not k.startswith("_")}
+                stamp = {}
                 if year is not None:
-                    csv_row['Year'] = f"20{year}"
+                    stamp['Year'] = f"20{year}"
                 if week is not None:
-                    csv_row['Week'] = week
-                writer.writerow(csv_row)
+                    stamp['Week'] = week
+
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(
+                    {**{k: v for k, v in table_row.items() if not k.startswith("_")}, **stamp}
+                    for table_row in filtered_rows
+                )
         return True
     except Exception as e:
         logging.error(f"Error writing CSV: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,48 @@
+"""
+Thread-safe token bucket for pacing Gemini API requests.
+
+LLM extraction runs several reports at once, so requests are paced up front to
+stay under the project's requests-per-minute quota instead of running into 429
+errors and burning extraction attempts on them.
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket that allows ``rate`` acquisitions per ``period`` seconds.
+
+    The bucket starts full, so a burst of up to ``rate`` requests goes out
+    immediately and later requests are spaced at ``period / rate`` seconds.
+    """
+
+    def __init__(self, rate, period=60.0, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.capacity = float(rate)
+        self.refill_per_second = rate / period
+        self._tokens = float(rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token, returning how long the caller must wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+            self._updated = now
+            # Going negative reserves a future token, so waiters queue in arrival order
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            self._sleep(delay)
@@ -123,14 +123,17 @@ def find_table3_page(pdf_path, default_page_index=3, year=None, week=None):
 
     Low-confidence legacy fallback results intentionally return status="fail"
     so callers do not silently enhance a page that was not positively located.
+    ``pdf_path`` may also be an open ``fitz.Document``, which is not closed.
     """
     fallback_page_index = legacy_table3_page_index(default_page_index, year=year, week=week)
     reasons = []
     warnings = []
     candidates = []
 
+    # An already-open document is borrowed from the caller and left open.
+    owns_doc = not isinstance(pdf_path, fitz.Document)
     try:
-        doc = fitz.open(pdf_path)
+        doc = fitz.open(pdf_path) if owns_doc else pdf_path
     except Exception as exc:
         return Table3PageResult(
             status="fail",
@@ -207,4 +210,5 @@ def find_table3_page(pdf_path, default_page_index=3, year=None, week=None):
             candidates=[candidate.to_dict() for candidate in ranked_candidates],
         )
     finally:
-        doc.close()
+        if owns_doc:
+            doc.close()
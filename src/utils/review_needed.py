@@ -59,8 +59,8 @@ def record_review_needed(
     try:
         output_path.parent.mkdir(parents=True, exist_ok=True)
         with output_path.open("a", encoding="utf-8") as outfile:
-            outfile.write(json.dumps(record, sort_keys=True))
-            outfile.write("\n")
+            # One write per record so concurrent extraction threads do not interleave lines
+            outfile.write(json.dumps(record, sort_keys=True) + "\n")
         return record
     except OSError as exc:
         logging.warning(f"Could not write review-needed record to {output_path}: {exc}")
@@ -0,0 +1,89 @@
+"""
+Shared setup for the Supabase/B2 status sync stages.
+
+The download, enhancement-sync and enhancement stages each need the same
+environment checks, a connected SQLAlchemy engine and filtered B2 listings.
+When the stages run through ``main.py`` a single ``SyncContext`` is built once
+and passed to each stage so the bucket is listed and the database connection is
+verified only once per pipeline run.
+"""
+
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Optional, Set
+
+from sqlalchemy.engine import Engine
+
+try:
+    from utils.cloud_storage import filter_b2_report_filenames, get_b2_file_list
+    from utils.db_utils import get_db_engine
+except ImportError:
+    from src.utils.cloud_storage import filter_b2_report_filenames, get_b2_file_list
+    from src.utils.db_utils import get_db_engine
+
+
+B2_ENV_VARS = ("B2_APPLICATION_KEY_ID", "B2_APPLICATION_KEY", "B2_BUCKET_NAME")
+
+
+@dataclass
+class SyncContext:
+    engine: Engine
+    b2_lists: dict[tuple[str, str], Set[str]] = field(default_factory=dict)
+    b2_files: Optional[Set[str]] = None
+
+    def b2_report_filenames(self, prefix: str, extension: str) -> Set[str]:
+        """
+        Return B2 filenames under ``prefix`` ending in ``extension``.
+
+        The full bucket listing is fetched on first use and reused for every
+        later prefix/extension pair. An empty listing is not cached so a
+        transient B2 error does not hide files from later stages.
+        """
+        key = (prefix, extension)
+        if key in self.b2_lists:
+            return self.b2_lists[key]
+
+        if not self.b2_files:
+            try:
+                self.b2_files = get_b2_file_list()
+            except Exception as e:
+                # Same fallback as get_b2_report_filenames: stages carry on with local files
+                logging.error(f"Error fetching or processing B2 file list: {e}")
+                return set()
+
+        report_filenames = filter_b2_report_filenames(self.b2_files, prefix, extension)
+        if self.b2_files:
+            self.b2_lists[key] = report_filenames
+        return report_filenames
+
+
+def build_sync_context(database_url: Optional[str] = None) -> Optional[SyncContext]:
+    """
+    Check the required environment and build a connected ``SyncContext``.
+
+    Args:
+        database_url: Database URL to use; defaults to ``DATABASE_URL``.
+
+    Returns:
+        SyncContext, or None if the environment is incomplete or the database
+        connection fails. Failures are logged as critical.
+    """
+    database_url = database_url or os.environ.get("DATABASE_URL")
+    if not database_url:
+        logging.critical("CRITICAL: DATABASE_URL environment variable not set. Exiting.")
+        return None
+
+    if not all(os.environ.get(name) for name in B2_ENV_VARS):
+        logging.critical("CRITICAL: B2 environment variables (B2_APPLICATION_KEY_ID, B2_APPLICATION_KEY, B2_BUCKET_NAME) not fully set. Exiting.")
+        return None
+
+    try:
+        engine = get_db_engine(database_url)
+        with engine.connect():  # Test connection
+            logging.info("Successfully connected to Supabase database.")
+    except Exception as e:
+        logging.critical(f"CRITICAL: Failed to create SQLAlchemy engine or connect to Supabase: {e}", exc_info=True)
+        return None
+
+    return SyncContext(engine=engine)
@@ -3,15 +3,69 @@ Pure table enhancement helpers for Lassa fever report PDFs.
 
 This module intentionally avoids Supabase, B2, and pipeline status side effects
 so local smoke tests and production stages can share the same PDF-to-PNG logic.
+Its only outputs are local files, which also makes enhance_report_job safe to
+run in worker processes.
 """
 
+import json
 import logging
+from functools import lru_cache
+from pathlib import Path
 
 import cv2
 import fitz
 import numpy as np
-from PIL import Image
 
+try:
+    from utils.artifact_paths import layout_qa_path_for_enhanced_path
+    from utils.report_layout import find_table3_page
+except ImportError:
+    from src.utils.artifact_paths import layout_qa_path_for_enhanced_path
+    from src.utils.report_layout import find_table3_page
+
+
+# Pixel constants below (and the Hough parameters in DEFAULT_PARAMS) were tuned
+# on 600 DPI renders; _scale_px rescales them when a different dpi is used.
+BASE_DPI = 600
+
+# Right-hand crop edge; 2020 reports changed layout from week to week.
+DEFAULT_WIDTH_RATIO = 0.59
+WIDTH_RATIO_2020 = {
+    **{week: 0.56 for week in range(25, 54)},
+    6: 0.65,
+    7: 0.57,
+    8: 0.57,
+    9: 0.60,
+    22: 0.60,
+}
+
+# Header space kept above and margin kept below the green rows, in BASE_DPI
+# pixels; 2020 reports have a taller header block.
+DEFAULT_CROP_MARGINS = (360, 20)
+CROP_MARGINS_BY_YEAR = {"20": (390, 120)}
+
+# zlib level 3 is much cheaper than PIL's default 6 for a slightly larger,
+# still lossless PNG (the image is the Gemini extraction input). A fixed "Up"
+# row filter skips libpng's per-row adaptive filter search, which dominated
+# encode time, at the same file size on these mostly-white table crops.
+PNG_WRITE_PARAMS = [
+    cv2.IMWRITE_PNG_COMPRESSION,
+    3,
+    cv2.IMWRITE_PNG_FILTER,
+    cv2.IMWRITE_PNG_FILTER_UP,
+]
+
+# Neutral grey, so drawing is the same whether the image is RGB or BGR.
+LINE_COLOR = (100, 100, 100)
+# Horizontal Hough runs on a mask shrunk by this factor; rules stay >= 1px.
+HOUGH_DOWNSCALE = 2
+
+# Resolution of the cheap full-page pass that only locates the green rows.
+DETECTION_DPI = 150
+
+# A row counts as green when more than this many pixels match the HSV band
+# (the historical 500000 mask-sum threshold divided by 255).
+GREEN_ROW_MIN_PIXELS = 500000 // 255
 
 DEFAULT_PARAMS = {
     "h1": 40,
@@ -26,50 +80,216 @@ DEFAULT_PARAMS = {
     "toler1": 10,
     "page_number": 3,
     "dpi": 600,
+    # "adaptive" (11px mean, historical) or "otsu" (single global threshold,
+    # cheaper; adequate for clean vector-rendered reports)
+    "threshold_method": "adaptive",
 }
 
+# HSV band of the pale green table rows, built once from DEFAULT_PARAMS.
+LOWER_GREEN = np.array([DEFAULT_PARAMS[k] for k in ("h1", "s1", "v1")], dtype=np.uint8)
+UPPER_GREEN = np.array([DEFAULT_PARAMS[k] for k in ("h2", "s2", "v2")], dtype=np.uint8)
+
+
+def _scale_px(value, dpi):
+    """Scale a pixel constant tuned at BASE_DPI to the render dpi."""
+    return max(1, int(round(value * dpi / BASE_DPI)))
+
+
+def _odd_px(value, dpi):
+    """Scale a kernel size and keep it odd, as adaptiveThreshold requires."""
+    return max(3, _scale_px(value, dpi) | 1)
+
+
+def _px_to_points(value, dpi):
+    return value * 72 / dpi
+
+
+def _render_rgb(page, dpi, clip=None):
+    """
+    Render a page (or a clip of it) to RGB.
+
+    Returns:
+        Tuple of (pixmap, array). The array is a writable view of the pixmap's
+        samples (no copy), so the pixmap must stay referenced while it is used.
+    """
+    pix = page.get_pixmap(dpi=dpi, clip=clip)
+    return pix, np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+
+
+def _green_bounds(h1, s1, v1, h2, s2, v2):
+    """Return inRange bounds, reusing the module arrays for the defaults."""
+    if (h1, s1, v1) == tuple(LOWER_GREEN) and (h2, s2, v2) == tuple(UPPER_GREEN):
+        return LOWER_GREEN, UPPER_GREEN
+    return np.array([h1, s1, v1], dtype=np.uint8), np.array([h2, s2, v2], dtype=np.uint8)
+
+
+def crop_width_ratio(year, week):
+    """Right-hand crop edge as a fraction of page width."""
+    if year == "20" and week is not None:
+        return WIDTH_RATIO_2020.get(int(week), DEFAULT_WIDTH_RATIO)
+    return DEFAULT_WIDTH_RATIO
+
 
-def detect_green_rows(hsv, lower_green, upper_green, pdf_path):
+def detect_green_rows(hsv, lower_green, upper_green, pdf_path, dpi=BASE_DPI):
     """Detect green rows in the image and return boundaries."""
     green_mask = cv2.inRange(hsv, lower_green, upper_green)
-    h_proj_green = np.sum(green_mask, axis=1)
-    green_row_indices = np.where(h_proj_green > 500000)[0]
+    # cv2.reduce only sums uint8 into CV_32S/32F/64F (CV_16U is rejected), so
+    # the 0/255 mask is summed as int32 and compared against pixels * 255.
+    row_sums = cv2.reduce(green_mask, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+    green_row_indices = np.flatnonzero(row_sums > _scale_px(GREEN_ROW_MIN_PIXELS, dpi) * 255)
 
     if len(green_row_indices) == 0:
         logging.warning(f"No green rows detected in {pdf_path}")
-        return 800, 4500
+        return _scale_px(800, dpi), _scale_px(4500, dpi)
     return green_row_indices[0], green_row_indices[-1]
 
 
+def _as_segments(lines):
+    """Return HoughLinesP output as an (N, 4) int32 array of x1, y1, x2, y2."""
+    if lines is None:
+        return np.empty((0, 4), dtype=np.int32)
+    # OpenCV 4 returns (N, 1, 4) and OpenCV 5 returns (N, 4)
+    return lines.reshape(-1, 4)
+
+
+def _draw_segments(img, segments, thickness):
+    """Draw (N, 4) segments in one cv2.polylines call."""
+    if len(segments):
+        cv2.polylines(img, segments.reshape(-1, 2, 2).astype(np.int32), False, LINE_COLOR, thickness)
+
+
+def _draw_vertical_rules(img, xs, y_top, y_bottom):
+    """
+    Paint 2px-thick vertical rules by slice assignment.
+
+    Reproduces cv2.line(..., thickness=2) exactly: columns x-1..x+1 over
+    y_top..y_bottom plus a one-pixel cap at x above and below.
+    """
+    height, width = img.shape[:2]
+    if not len(xs):
+        return
+    cols = np.unique(np.clip((xs[:, None] + np.arange(-1, 2)).ravel(), 0, width - 1))
+    img[max(y_top, 0):max(min(y_bottom + 1, height), 0), cols] = LINE_COLOR
+    cap_xs = xs[(xs >= 0) & (xs < width)]
+    for cap_y in (y_top - 1, y_bottom + 1):
+        if 0 <= cap_y < height:
+            img[cap_y, cap_xs] = LINE_COLOR
+
+
+def _draw_horizontal_segments(img, segments, thickness=1):
+    """
+    Paint horizontal segments ``thickness`` rows tall by fancy indexing.
+
+    Flat segments (y1 == y2) fill rows y..y+thickness-1 as pixel runs in one
+    assignment; the few slightly slanted ones still go through cv2.polylines.
+    Segments found on a mask downscaled by N cover N full-resolution rows each,
+    so they are drawn with ``thickness=N`` to keep thick rules solid.
+    """
+    flat = segments[segments[:, 1] == segments[:, 3]]
+    _draw_segments(img, segments[segments[:, 1] != segments[:, 3]], thickness)
+
+    height, width = img.shape[:2]
+    if thickness > 1:
+        flat = np.repeat(flat, thickness, axis=0)
+        flat[:, [1, 3]] += np.tile(np.arange(thickness), len(flat) // thickness)[:, None]
+    flat = flat[(flat[:, 1] >= 0) & (flat[:, 1] < height)]
+    if not len(flat):
+        return
+    x_start = np.clip(np.minimum(flat[:, 0], flat[:, 2]), 0, width - 1)
+    x_end = np.clip(np.maximum(flat[:, 0], flat[:, 2]), 0, width - 1)
+    lengths = x_end - x_start + 1
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    img[np.repeat(flat[:, 1], lengths), np.repeat(x_start, lengths) + offsets] = LINE_COLOR
+
+
+@lru_cache(maxsize=None)
+def _line_kernel(width, height):
+    """Rectangular structuring element, built once per size."""
+    return cv2.getStructuringElement(cv2.MORPH_RECT, (max(1, width), max(1, height)))
+
+
+def threshold_table_region(table_region, method="adaptive", dpi=BASE_DPI):
+    """
+    Binarize the grayscale table band with ink as 255.
+
+    Args:
+        table_region: uint8 grayscale band between the green-row boundaries.
+        method: "adaptive" for the historical 11px local mean threshold, or
+            "otsu" for one global threshold computed from the histogram.
+        dpi: Render resolution, used to scale the adaptive block size.
+
+    Returns:
+        uint8 mask suitable for the line detectors.
+    """
+    if method == "otsu":
+        _, thresh = cv2.threshold(table_region, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        return thresh
+    if method != "adaptive":
+        raise ValueError(f"Unknown threshold_method: {method!r}")
+    return cv2.adaptiveThreshold(
+        table_region,
+        255,
+        cv2.ADAPTIVE_THRESH_MEAN_C,
+        cv2.THRESH_BINARY_INV,
+        _odd_px(11, dpi),
+        3,
+    )
+
+
 def process_vertical_lines(thresh_table, tr1, linelength1, linegap1):
-    """Find vertical lines using Hough transform."""
+    """
+    Find vertical column separators, as an (N, 4) array of x1, y1, x2, y2.
+
+    Table rules are strictly vertical, so instead of a probabilistic Hough
+    transform the mask is closed over gaps up to ``linegap1``, opened with a
+    ``linelength1``-tall kernel to drop text strokes, and projected onto the
+    x axis. Every column with at least ``tr1`` lit pixels (the old Hough vote
+    threshold) yields a line spanning the table band; thick rules produce a
+    few adjacent lines, just as Hough returned near-duplicate segments.
+    """
+    height = thresh_table.shape[0]
+    if height == 0:
+        return np.empty((0, 4), dtype=np.int32)
+
+    vertical = cv2.morphologyEx(thresh_table, cv2.MORPH_CLOSE, _line_kernel(1, linegap1))
+    vertical = cv2.morphologyEx(vertical, cv2.MORPH_OPEN, _line_kernel(1, linelength1))
+    col_sums = cv2.reduce(vertical, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+    xs = np.flatnonzero(col_sums >= tr1 * 255).astype(np.int32)
+
+    lines = np.empty((len(xs), 4), dtype=np.int32)
+    lines[:, 0] = xs
+    lines[:, 1] = 0
+    lines[:, 2] = xs
+    lines[:, 3] = height - 1
+    return lines
+
+
+def process_horizontal_lines(thresh_table, dpi=BASE_DPI, downscale=HOUGH_DOWNSCALE):
+    """
+    Find horizontal lines using Hough transform.
+
+    The mask is shrunk by ``downscale`` first (area averaging keeps thin rules
+    as non-zero pixels), which cuts the voting work by ``downscale**2``; the
+    segments are returned as an (N, 4) array in full-resolution pixels.
+    """
+    if downscale > 1:
+        thresh_table = cv2.resize(
+            thresh_table,
+            None,
+            fx=1 / downscale,
+            fy=1 / downscale,
+            interpolation=cv2.INTER_AREA,
+        )
+    hough_dpi = dpi / downscale
     lines = cv2.HoughLinesP(
         thresh_table,
         1,
         np.pi / 180,
-        threshold=tr1,
-        minLineLength=linelength1,
-        maxLineGap=linegap1,
-    )
-    vertical_lines = []
-    if lines is not None:
-        for line in lines:
-            x1, y1, x2, y2 = line[0]
-            if abs(x2 - x1) < 5:
-                vertical_lines.append((x1, y1, x2, y2))
-    return vertical_lines
-
-
-def process_horizontal_lines(thresh_table):
-    """Find horizontal lines using Hough transform."""
-    return cv2.HoughLinesP(
-        thresh_table,
-        1,
-        np.pi / 180,
-        threshold=400,
-        minLineLength=50,
-        maxLineGap=10,
+        threshold=_scale_px(400, hough_dpi),
+        minLineLength=_scale_px(50, hough_dpi),
+        maxLineGap=_scale_px(10, hough_dpi),
     )
+    return _as_segments(lines) * downscale
 
 
 def enhance_table_lines_from_pdf_hq(
@@ -87,78 +307,183 @@ def enhance_table_lines_from_pdf_hq(
     v2,
     page_number=3,
     dpi=600,
+    threshold_method="adaptive",
     year=None,
     week=None,
 ):
     """
     Enhance vertical column separators and horizontal table lines.
 
-    The current implementation preserves the production crop heuristics. Dynamic
-    Table 3 page detection and layout QA will be layered on top later.
+    The current implementation preserves the production crop heuristics. Pixel
+    offsets and Hough parameters are tuned for ``BASE_DPI`` and rescaled when a
+    different ``dpi`` is passed, so batch runs can trade resolution for speed.
+    ``pdf_path`` may also be an open ``fitz.Document``, which is not closed.
+    ``page_number`` is the 0-based page index chosen by the caller (layout QA
+    or ``legacy_table3_page_index``); ``year``/``week`` only steer the crop.
     """
-    doc = fitz.open(pdf_path)
+    owns_doc = not isinstance(pdf_path, fitz.Document)
+    doc = fitz.open(pdf_path) if owns_doc else pdf_path
     try:
-        if year == "20" and week == "23":
-            page_number = 4
         page = doc[page_number]
 
-        pix = page.get_pixmap(dpi=dpi)
-        img_pil = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        img = cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
-
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        lower_green = np.array([h1, s1, v1], dtype=np.uint8)
-        upper_green = np.array([h2, s2, v2], dtype=np.uint8)
-        top_boundary, bottom_boundary = detect_green_rows(hsv, lower_green, upper_green, pdf_path)
-
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        table_region = gray[top_boundary:bottom_boundary, :]
-        thresh_table = cv2.adaptiveThreshold(
-            table_region,
-            255,
-            cv2.ADAPTIVE_THRESH_MEAN_C,
-            cv2.THRESH_BINARY_INV,
-            11,
-            3,
+        # Locate the green rows on a cheap low-resolution render of the whole
+        # page, then rasterize only the cropped table region at full dpi.
+        # Arrays come straight from the pixmap buffer and stay RGB: the
+        # drawing colour is neutral grey, so channel order does not matter.
+        preview_pix, preview = _render_rgb(page, DETECTION_DPI)
+        hsv = cv2.cvtColor(preview, cv2.COLOR_RGB2HSV)
+        lower_green, upper_green = _green_bounds(h1, s1, v1, h2, s2, v2)
+        top_row, bottom_row = detect_green_rows(hsv, lower_green, upper_green, doc.name, DETECTION_DPI)
+        del preview_pix, preview, hsv
+
+        page_rect = page.rect
+        top_pt = page_rect.y0 + _px_to_points(top_row, DETECTION_DPI)
+        bottom_pt = page_rect.y0 + _px_to_points(bottom_row + 1, DETECTION_DPI)
+        margin_above, margin_below = CROP_MARGINS_BY_YEAR.get(year, DEFAULT_CROP_MARGINS)
+        crop_top_pt = top_pt - _px_to_points(margin_above, BASE_DPI)
+        crop_bottom_pt = bottom_pt + _px_to_points(margin_below, BASE_DPI)
+        clip = fitz.Rect(
+            page_rect.x0 + page_rect.width * 0.07,
+            max(crop_top_pt, page_rect.y0),
+            page_rect.x0 + page_rect.width * crop_width_ratio(year, week),
+            min(crop_bottom_pt, page_rect.y1),
+        )
+
+        pix, img = _render_rgb(page, dpi, clip)
+        top_boundary = max(0, int((top_pt - clip.y0) * dpi / 72))
+        bottom_boundary = min(img.shape[0], int(np.ceil((bottom_pt - clip.y0) * dpi / 72)))
+
+        # Only the green-row band is thresholded, so convert just that slice.
+        # A second csGRAY render of the band costs as much as this conversion
+        # on simple pages (more on dense ones) and shifts the binarization.
+        table_region = cv2.cvtColor(img[top_boundary:bottom_boundary], cv2.COLOR_RGB2GRAY)
+        thresh_table = threshold_table_region(table_region, threshold_method, dpi)
+
+        vertical_lines = process_vertical_lines(
+            thresh_table,
+            _scale_px(tr1, dpi),
+            _scale_px(linelength1, dpi),
+            _scale_px(linegap1, dpi),
+        )
+        # Extend vertical separators from the header down past the last row.
+        _draw_vertical_rules(
+            img,
+            vertical_lines[:, 0],
+            top_boundary - _scale_px(110, dpi),
+            bottom_boundary + _scale_px(10, dpi),
         )
 
-        vertical_lines = process_vertical_lines(thresh_table, tr1, linelength1, linegap1)
-        for x1, y1, x2, y2 in vertical_lines:
-            cv2.line(img, (x1, top_boundary - 110), (x2, bottom_boundary + 10), (100, 100, 100), 2)
-
-        lines_h = process_horizontal_lines(thresh_table)
-        if lines_h is not None:
-            for line in lines_h:
-                x1, y1, x2, y2 = line[0]
-                if abs(y2 - y1) < 5:
-                    y1_global = y1 + top_boundary
-                    y2_global = y2 + top_boundary
-                    cv2.line(img, (x1, y1_global), (x2, y2_global), (100, 100, 100), 1)
-
-        if year == "20":
-            crop_bottom = min(bottom_boundary + 120, img.shape[0])
-            crop_top = top_boundary - 390
-        else:
-            crop_bottom = min(bottom_boundary + 20, img.shape[0])
-            crop_top = top_boundary - 360
-
-        width_ratio = 0.59
-        if year == "20" and week is not None:
-            if int(week) >= 25:
-                width_ratio = 0.56
-            elif int(week) in [9, 22]:
-                width_ratio = 0.60
-            elif int(week) in [6]:
-                width_ratio = 0.65
-            elif int(week) in [7, 8]:
-                width_ratio = 0.57
-
-        new_width = int(img.shape[1] * width_ratio)
-        new_width2 = int(img.shape[1] * 0.07)
-        img_cropped = img[crop_top:crop_bottom, new_width2:new_width]
-
-        output_pil = Image.fromarray(cv2.cvtColor(img_cropped, cv2.COLOR_BGR2RGB))
-        output_pil.save(output_path)
+        lines_h = process_horizontal_lines(thresh_table, dpi)
+        lines_h = lines_h[np.abs(lines_h[:, 3] - lines_h[:, 1]) < 5]
+        lines_h[:, [1, 3]] += top_boundary
+        _draw_horizontal_segments(img, lines_h, HOUGH_DOWNSCALE)
+        del table_region, thresh_table
+
+        # Swap channels in place in the pixmap buffer rather than allocating
+        # a second full-size image; pix stays referenced until the write.
+        cv2.cvtColor(img, cv2.COLOR_RGB2BGR, dst=img)
+        if not cv2.imwrite(str(output_path), img, PNG_WRITE_PARAMS):
+            raise OSError(f"Could not write enhanced image to {output_path}")
         return True
     finally:
-        doc.close()
+        if owns_doc:
+            doc.close()
+
+
+def write_layout_qa(layout_qa_path: Path, layout_result):
+    """Write the layout QA result beside an enhanced image artifact."""
+    layout_qa_path.parent.mkdir(parents=True, exist_ok=True)
+    with layout_qa_path.open("w", encoding="utf-8") as outfile:
+        json.dump(layout_result.to_dict(), outfile, indent=2, sort_keys=True)
+        outfile.write("\n")
+
+
+def enhance_report_pdf(pdf_path: Path, output_path: Path, year, week) -> bool:
+    """Run layout QA and then enhance a report PDF when Table 3 is located."""
+    try:
+        doc = fitz.open(pdf_path)
+    except Exception:
+        # Layout QA records the open failure in its sidecar and fails.
+        return _enhance_report_source(pdf_path, pdf_path, output_path, year, week)
+    with doc:
+        return _enhance_report_source(doc, pdf_path, output_path, year, week)
+
+
+def _enhance_report_source(source, pdf_path: Path, output_path: Path, year, week) -> bool:
+    # Layout detection and rendering share one open document.
+    layout_result = find_table3_page(
+        source,
+        default_page_index=DEFAULT_PARAMS["page_number"],
+        year=year,
+        week=week,
+    )
+    layout_qa_path = layout_qa_path_for_enhanced_path(output_path)
+    write_layout_qa(layout_qa_path, layout_result)
+
+    logging.info(
+        "Layout QA for %s: status=%s confidence=%s selected_page=%s",
+        pdf_path.name,
+        layout_result.status,
+        layout_result.confidence,
+        layout_result.selected_page_number,
+    )
+    for warning in layout_result.warnings:
+        logging.warning(f"Layout QA warning for {pdf_path.name}: {warning}")
+
+    if layout_result.status == "fail":
+        for reason in layout_result.reasons:
+            logging.error(f"Layout QA failed for {pdf_path.name}: {reason}")
+        return False
+
+    enhancement_params = DEFAULT_PARAMS.copy()
+    enhancement_params["page_number"] = layout_result.selected_page_index
+    return enhance_table_lines_from_pdf_hq(
+        source,
+        str(output_path),
+        **enhancement_params,
+        year=year,
+        week=week,
+    )
+
+
+def opencv_has_avx2(build_information=None):
+    """Return True if OpenCV was built with AVX2 as baseline or dispatched code."""
+    build_information = build_information or cv2.getBuildInformation()
+    for line in build_information.splitlines():
+        label = line.strip().split(":", 1)[0]
+        if label in ("Baseline", "Dispatched code generation") and "AVX2" in line.split(":", 1)[1].split():
+            return True
+    return False
+
+
+def check_opencv_build():
+    """Warn once per run when the OpenCV build has no AVX2 code paths."""
+    if not opencv_has_avx2():
+        logging.warning(
+            f"OpenCV {cv2.__version__} was built without AVX2 kernels; line detection "
+            "will use slower SSE paths. Install the official opencv-python wheels."
+        )
+
+
+def init_enhancement_worker():
+    """Process-pool initializer: keep OpenCV single-threaded per worker."""
+    cv2.setNumThreads(1)
+
+
+def enhance_report_job(job):
+    """
+    Enhance one report for a process pool.
+
+    Args:
+        job: Dict with ``pdf_path``, ``output_path``, ``year`` and ``week``;
+            any other keys are passed back untouched.
+
+    Returns:
+        Tuple of (job, success, error message or None). Never raises, so one
+        bad PDF does not abort the rest of the batch.
+    """
+    try:
+        success = enhance_report_pdf(Path(job["pdf_path"]), Path(job["output_path"]), job["year"], job["week"])
+        return job, bool(success), None
+    except Exception as e:
+        return job, False, str(e)
@@ -0,0 +1,37 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.utils.atomic_write import PART_SUFFIX, atomic_write_path
+
+
+class AtomicWritePathTests(unittest.TestCase):
+    def test_complete_write_replaces_target(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = Path(temp_dir) / "report.csv"
+            target.write_text("old")
+
+            with atomic_write_path(target) as part_path:
+                self.assertEqual(target.name + PART_SUFFIX, part_path.name)
+                part_path.write_text("new")
+                self.assertEqual("old", target.read_text())
+
+            self.assertEqual("new", target.read_text())
+            self.assertEqual([target], list(Path(temp_dir).iterdir()))
+
+    def test_failed_write_keeps_target_and_removes_part_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = Path(temp_dir) / "report.csv"
+            target.write_text("old")
+
+            with self.assertRaises(RuntimeError):
+                with atomic_write_path(target) as part_path:
+                    part_path.write_text("trunc")
+                    raise RuntimeError("interrupted")
+
+            self.assertEqual("old", target.read_text())
+            self.assertEqual([target], list(Path(temp_dir).iterdir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
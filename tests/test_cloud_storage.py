@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from b2sdk.v2.exception import B2Error
+
+from src.utils import cloud_storage
+
+
+class DownloadFileTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.local_path = Path(self.temp_dir.name) / "2025" / "report.pdf"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def fake_api(self, save_to):
+        api = MagicMock()
+        api.get_bucket_by_name.return_value.download_file_by_name.return_value.save_to.side_effect = save_to
+        return api
+
+    def test_download_is_renamed_into_place(self):
+        def save_to(path):
+            self.assertTrue(path.endswith(".part"))
+            Path(path).write_bytes(b"%PDF-1.7")
+
+        with patch.object(cloud_storage, "get_b2_api", return_value=self.fake_api(save_to)):
+            self.assertTrue(cloud_storage.download_file("raw/report.pdf", self.local_path, bucket="bucket"))
+
+        self.assertEqual(b"%PDF-1.7", self.local_path.read_bytes())
+        self.assertEqual(["report.pdf"], [p.name for p in self.local_path.parent.iterdir()])
+
+    def test_interrupted_download_leaves_no_file(self):
+        def save_to(path):
+            Path(path).write_bytes(b"%PDF-1.")
+            raise B2Error("connection reset")
+
+        with patch.object(cloud_storage, "get_b2_api", return_value=self.fake_api(save_to)):
+            self.assertFalse(cloud_storage.download_file("raw/report.pdf", self.local_path, bucket="bucket"))
+
+        self.assertEqual([], list(self.local_path.parent.iterdir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
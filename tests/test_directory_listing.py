@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.utils.directory_listing import directory_names, file_exists, list_directory_names
+
+
+class DirectoryListingTests(unittest.TestCase):
+    def test_directory_is_listed_once_and_missing_directory_is_empty(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            folder = Path(temp_dir)
+            (folder / "a.png").write_bytes(b"png")
+            listings = {}
+
+            self.assertEqual({"a.png"}, directory_names(folder, listings))
+            (folder / "b.png").write_bytes(b"png")
+            # Cached listing is reused rather than rescanned
+            self.assertEqual({"a.png"}, directory_names(folder, listings))
+            self.assertEqual(set(), directory_names(folder / "missing", listings))
+
+    def test_file_exists_uses_listing_and_stats_unlisted_directories(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            folder = Path(temp_dir) / "listed"
+            other = Path(temp_dir) / "other"
+            folder.mkdir()
+            other.mkdir()
+            (folder / "a.csv").write_text("x")
+            (other / "b.csv").write_text("x")
+            listings = list_directory_names([folder])
+
+            with patch.object(Path, "exists", side_effect=AssertionError("stat")):
+                self.assertTrue(file_exists(folder / "a.csv", listings))
+                self.assertFalse(file_exists(folder / "c.csv", listings))
+            self.assertTrue(file_exists(other / "b.csv", listings))
+            self.assertTrue(file_exists(other / "b.csv", None))
+
+
+if __name__ == "__main__":
+    unittest.main()
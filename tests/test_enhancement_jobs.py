@@ -0,0 +1,148 @@
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.utils import enhancement_jobs
+from src.utils.enhancement_jobs import fetch_and_enhance_report_job
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_enhancement_stage():
+    spec = importlib.util.spec_from_file_location("table_enhancement_stage", ROOT / "src" / "03b_TableEnhancement_Supabase.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FetchAndEnhanceReportJobTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = str(Path(self.temp_dir.name) / "r.pdf")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_downloads_raw_pdf_before_enhancing(self):
+        job = {"b2_key": "lassa-reports/data/raw/year/2025/r.pdf", "pdf_path": self.pdf_path}
+
+        with patch.object(enhancement_jobs, "download_file", return_value=True) as download, patch.object(
+            enhancement_jobs, "enhance_report_job", return_value=(job, True, None)
+        ) as enhance:
+            result = fetch_and_enhance_report_job(job)
+
+        download.assert_called_once_with("lassa-reports/data/raw/year/2025/r.pdf", self.pdf_path)
+        enhance.assert_called_once_with(job)
+        self.assertEqual((job, True, None), result)
+
+    def test_local_pdf_is_not_downloaded(self):
+        job = {"b2_key": None, "pdf_path": self.pdf_path}
+
+        with patch.object(enhancement_jobs, "download_file") as download, patch.object(
+            enhancement_jobs, "enhance_report_job", return_value=(job, True, None)
+        ):
+            fetch_and_enhance_report_job(job)
+
+        download.assert_not_called()
+
+    def test_complete_local_pdf_is_not_downloaded_again(self):
+        Path(self.pdf_path).write_bytes(b"%PDF-1.7")
+        job = {"b2_key": "raw/r.pdf", "pdf_path": self.pdf_path}
+
+        with patch.object(enhancement_jobs, "download_file") as download:
+            self.assertIsNone(enhancement_jobs.fetch_report_pdf(job))
+
+        download.assert_not_called()
+
+    def test_failed_download_is_reported_without_enhancing(self):
+        job = {"b2_key": "raw/r.pdf", "pdf_path": self.pdf_path}
+
+        with patch.object(enhancement_jobs, "download_file", side_effect=RuntimeError("timeout")), patch.object(
+            enhancement_jobs, "enhance_report_job"
+        ) as enhance:
+            returned_job, success, error = fetch_and_enhance_report_job(job)
+
+        enhance.assert_not_called()
+        self.assertIs(returned_job, job)
+        self.assertFalse(success)
+        self.assertIn("timeout", error)
+
+
+class RunEnhancementJobsTests(unittest.TestCase):
+    def test_inline_run_prefetches_downloads_and_keeps_job_order(self):
+        stage = load_enhancement_stage()
+        jobs = [{"name": "a", "b2_key": "raw/a.pdf"}, {"name": "b", "b2_key": "raw/b.pdf"}, {"name": "c", "b2_key": None}]
+
+        def fetch(job):
+            return "Download of raw/b.pdf failed" if job["name"] == "b" else None
+
+        with patch.object(stage, "fetch_report_pdf", side_effect=fetch), patch.object(
+            stage, "enhance_report_job", side_effect=lambda job: (job, True, None)
+        ) as enhance:
+            results = list(stage.run_enhancement_jobs(jobs, workers=1))
+
+        self.assertEqual(["a", "b", "c"], [job["name"] for job, _, _ in results])
+        self.assertEqual([True, False, True], [success for _, success, _ in results])
+        self.assertEqual(2, enhance.call_count)
+
+
+class RecordingSession:
+    def __init__(self, executed):
+        self.executed = executed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def execute(self, stmt, params=None):
+        self.executed.append((str(stmt), params))
+        return self
+
+    def mappings(self):
+        return [{"id": "id-1", "new_name": "Nigeria_01_Jan_25_W01.pdf", "year": "25", "week": "1", "compatible": "Y"}]
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class UpdateEnhancedStatusesTests(unittest.TestCase):
+    def test_updates_are_sent_in_batches(self):
+        stage = load_enhancement_stage()
+        executed = []
+        updates = [(f"id-{i}", f"Lines_{i}_page3.png") for i in range(stage.STATUS_BATCH_SIZE + 2)]
+
+        with patch.object(stage, "Session", lambda engine: RecordingSession(executed)):
+            stage.update_enhanced_statuses(object(), updates)
+
+        self.assertEqual(2, len(executed))
+        sql, params = executed[1]
+        self.assertIn("FROM (VALUES", sql)
+        self.assertEqual({"status": "Y", "id_0": "id-50", "name_0": "Lines_50_page3.png", "id_1": "id-51", "name_1": "Lines_51_page3.png"}, params)
+
+
+class GetReportsToEnhanceTests(unittest.TestCase):
+    def test_batch_size_limits_query(self):
+        stage = load_enhancement_stage()
+        executed = []
+
+        with patch.object(stage, "Session", lambda engine: RecordingSession(executed)):
+            unlimited = stage.get_reports_to_enhance(object())
+            limited = stage.get_reports_to_enhance(object(), batch_size=25)
+
+        self.assertNotIn("LIMIT", executed[0][0])
+        self.assertIn("LIMIT :batch_size", executed[1][0])
+        self.assertEqual({"batch_size": 25}, executed[1][1])
+        self.assertEqual(unlimited, limited)
+        self.assertEqual("Nigeria_01_Jan_25_W01.pdf", limited[0]["new_name"])
+
+
+if __name__ == "__main__":
+    unittest.main()
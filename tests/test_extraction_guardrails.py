@@ -13,7 +13,7 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from src.prompts.table_extraction_prompt import TABLE_EXTRACTION_PROMPT
-from src.utils.data_validation import filter_comparison_columns
+from src.utils.extraction_validation import _comparison_rows
 
 
 def load_llm_extraction_module():
@@ -65,15 +65,66 @@ class ExtractionGuardrailTests(unittest.TestCase):
             },
         ]
 
-    def test_filter_comparison_columns_keeps_all_rows(self):
+    def test_comparison_rows_keep_all_rows(self):
         rows = [
             {"States": "Ondo", "Suspected": "51", "Confirmed": "3", "Deaths": ""},
             {"States": "Total", "Suspected": "51", "Confirmed": "3", "Deaths": ""},
         ]
 
-        filtered = filter_comparison_columns(rows)
+        _, comparison = _comparison_rows(rows)
 
-        self.assertEqual(rows, filtered)
+        self.assertEqual([{**rows[0], "States": "ondo"}, {**rows[1], "States": "total"}], comparison)
+
+    def test_comparison_rows_normalize_states_and_keep_comparison_columns(self):
+        rows = self.valid_rows() + [
+            {"States": "Cross-River", "Suspected": "7", "Confirmed": "1", "Probable": "2", "HCW": "", "Deaths": "0"},
+            {"States": "Akwa-Ibom", "Suspected": "4", "HCW": "1"},
+            {"States": "", "Suspected": "9", "Confirmed": "9", "Deaths": "9"},
+        ]
+
+        normalized, comparison = _comparison_rows(rows)
+
+        self.assertEqual(["akwa ibom", "cross river", "ondo", "total"], [row["States"] for row in normalized])
+        self.assertEqual({"States": "akwa ibom", "Suspected": "4", "HCW": "1"}, normalized[0])
+        self.assertEqual("Akwa-Ibom", rows[-2]["States"])
+        self.assertEqual(
+            [
+                {"States": "akwa ibom", "Suspected": "4"},
+                {"States": "cross river", "Suspected": "7", "Confirmed": "1", "Deaths": "0"},
+                {"States": "ondo", "Suspected": "51", "Confirmed": "3", "Deaths": ""},
+                {"States": "total", "Suspected": "51", "Confirmed": "3", "Deaths": ""},
+            ],
+            comparison,
+        )
+
+    def test_sort_table_rows_orders_states_case_insensitively_with_total_last(self):
+        from src.utils.data_validation import sort_table_rows
+
+        rows = [
+            {"States": "Total", "Suspected": ""},
+            {"States": "ondo", "Suspected": "1"},
+            {"States": " Edo", "Suspected": "2"},
+            {"States": "", "Suspected": "3"},
+            {"States": "Bauchi", "Suspected": " "},
+            {"States": "Ondo", "Suspected": "4"},
+        ]
+
+        self.assertEqual(
+            [" Edo", "ondo", "Ondo", "Total"],
+            [row["States"] for row in sort_table_rows(rows)],
+        )
+
+    def test_validate_logical_consistency_fixes_copies_without_touching_input(self):
+        from src.utils.data_validation import validate_logical_consistency
+
+        rows = [{"States": "Edo", "Suspected": "2", "Confirmed": "5", "Probable": "", "HCW": "", "Deaths": "1"}]
+
+        is_valid, validated_rows, errors = validate_logical_consistency(rows)
+
+        self.assertFalse(is_valid)
+        self.assertEqual("5", validated_rows[0]["Suspected"])
+        self.assertEqual("2", rows[0]["Suspected"])
+        self.assertEqual(1, len(errors))
 
     def test_get_enhanced_image_downloads_to_derived_year_folder(self):
         module = load_llm_extraction_module()
@@ -93,6 +144,25 @@ class ExtractionGuardrailTests(unittest.TestCase):
                 str(expected_path),
             )
 
+    def test_get_enhanced_image_uses_directory_listing_instead_of_stat(self):
+        module = load_llm_extraction_module()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            module.ENHANCED_FOLDER = Path(temp_dir) / "PDF"
+            year_dir = module.ENHANCED_FOLDER / "PDFs_Lines_26"
+            year_dir.mkdir(parents=True)
+            (year_dir / "Lines_a_page3.png").write_bytes(b"png")
+            listings = module.list_directory_names([year_dir, module.ENHANCED_FOLDER / "PDFs_Lines_27"])
+
+            with patch.object(module, "download_file", return_value=True) as download_mock:
+                found = module.get_enhanced_image("Lines_a_page3.png", "26", listings)
+                missing = module.get_enhanced_image("Lines_b_page3.png", "26", listings)
+
+        self.assertEqual(set(), listings[module.ENHANCED_FOLDER / "PDFs_Lines_27"])
+        self.assertEqual(year_dir / "Lines_a_page3.png", found)
+        self.assertEqual(year_dir / "Lines_b_page3.png", missing)
+        download_mock.assert_called_once()
+
     def test_validate_extraction_results_passes_matching_valid_outputs(self):
         from src.utils.extraction_validation import validate_extraction_results
 
@@ -208,6 +278,68 @@ class ExtractionGuardrailTests(unittest.TestCase):
         self.assertEqual("fail", result.status)
         self.assertIsNone(result.selected_rows)
 
+    def test_validate_latest_extractions_accepts_agreement_with_earlier_attempt(self):
+        from src.utils.extraction_validation import validate_latest_extractions
+
+        rows_1 = self.valid_rows()
+        rows_2 = self.valid_rows()
+        rows_2[1] = {**rows_2[1], "Confirmed": "4"}
+        rows_3 = self.valid_rows()
+        rows_4 = self.valid_rows()
+        rows_4[0] = {**rows_4[0], "Suspected": "50"}
+
+        agree = validate_latest_extractions([rows_1, rows_2, rows_3], 1, "image.png", attempt=2, max_attempts=3)
+        disagree = validate_latest_extractions([rows_1, rows_2, rows_4], 1, "image.png", attempt=3, max_attempts=3)
+
+        self.assertEqual("pass", agree.status)
+        self.assertEqual(rows_1, agree.selected_rows)
+        self.assertEqual("fail", disagree.status)
+        # The reported mismatch is for the two newest outputs
+        self.assertIn("4", [row["Confirmed"] for row in disagree.comparison_1])
+        self.assertIn("50", [row["Suspected"] for row in disagree.comparison_2])
+
+    def test_parse_gemini_response_dumps_rows_by_alias_and_rejects_unparsed_rows(self):
+        from src.utils.gemini_extractor import TableRow, parse_gemini_response
+
+        row = TableRow(States="Edo", Suspected="4", Confirmed="2", Probable="", HCW="", Deaths="1")
+
+        self.assertEqual(
+            (True, [{"States": "Edo", "Suspected": "4", "Confirmed": "2", "Probable": "", "HCW": "", "Deaths": "1"}]),
+            parse_gemini_response(SimpleNamespace(parsed=[row])),
+        )
+        self.assertFalse(parse_gemini_response(SimpleNamespace(parsed=[{"States": "Edo"}]))[0])
+
+    def test_save_extracted_data_to_csv_replaces_file_only_after_complete_write(self):
+        from src.utils.gemini_extractor import save_extracted_data_to_csv
+
+        fieldnames = ["States", "Suspected", "Confirmed", "Probable", "HCW", "Deaths"]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "Lines_a_page3.csv"
+            output_path.write_text("previous\n", encoding="utf-8")
+            bad_rows = self.valid_rows() + [{"States": "Edo", "Suspected": "1", "Unexpected": "x"}]
+
+            with self.assertLogs(level="ERROR"):
+                self.assertFalse(save_extracted_data_to_csv(bad_rows, output_path, fieldnames, year="26", week="1"))
+            self.assertEqual("previous\n", output_path.read_text(encoding="utf-8"))
+
+            self.assertTrue(save_extracted_data_to_csv(self.valid_rows(), output_path, fieldnames, year="26", week="1"))
+            lines = output_path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual("Week,Year,States,Suspected,Confirmed,Probable,HCW,Deaths", lines[0])
+            self.assertEqual("1,2026,Ondo,51,3,,,", lines[1])
+            self.assertEqual(["Lines_a_page3.csv"], [path.name for path in Path(temp_dir).iterdir()])
+
+    def test_load_image_part_sends_file_bytes_unchanged(self):
+        from src.utils.gemini_extractor import load_image_part
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            image_path = Path(temp_dir) / "Lines_a_page3.png"
+            image_path.write_bytes(b"\x89PNG-bytes")
+
+            part = load_image_part(image_path)
+
+        self.assertEqual(b"\x89PNG-bytes", part.inline_data.data)
+        self.assertEqual("image/png", part.inline_data.mime_type)
+
     def test_prompt_maps_report_headers_to_schema_keys(self):
         self.assertIn('report column labelled "HCW*"', TABLE_EXTRACTION_PROMPT)
         self.assertIn('JSON key "HCW"', TABLE_EXTRACTION_PROMPT)
@@ -221,7 +353,6 @@ class ExtractionGuardrailTests(unittest.TestCase):
         rows_2 = self.valid_rows()
         rows_2[1] = {**rows_2[1], "Confirmed": "4"}
         rows_3 = self.valid_rows()
-        rows_4 = self.valid_rows()
 
         with tempfile.TemporaryDirectory() as temp_dir:
             module.CSV_BASE_FOLDER = Path(temp_dir)
@@ -233,6 +364,7 @@ class ExtractionGuardrailTests(unittest.TestCase):
             }
 
             with patch.object(module, "get_enhanced_image", return_value=Path(temp_dir) / "image.png"), \
+                patch.object(module, "load_image_part", return_value="image-part") as load_mock, \
                 patch.object(
                     module,
                     "extract_table_with_gemini",
@@ -240,7 +372,6 @@ class ExtractionGuardrailTests(unittest.TestCase):
                         (True, "response-1"),
                         (True, "response-2"),
                         (True, "response-3"),
-                        (True, "response-4"),
                     ],
                 ) as extract_mock, \
                 patch.object(
@@ -250,7 +381,6 @@ class ExtractionGuardrailTests(unittest.TestCase):
                         (True, rows_1),
                         (True, rows_2),
                         (True, rows_3),
-                        (True, rows_4),
                     ],
                 ), \
                 patch.object(module, "save_extracted_data_to_csv", return_value=True) as save_mock, \
@@ -267,7 +397,10 @@ class ExtractionGuardrailTests(unittest.TestCase):
                 qa = json.loads(qa_path.read_text(encoding="utf-8"))
 
         self.assertTrue(success)
-        self.assertEqual(4, extract_mock.call_count)
+        # The retry adds one extraction, which agrees with the first attempt's first output
+        self.assertEqual(3, extract_mock.call_count)
+        load_mock.assert_called_once()
+        self.assertEqual({"image-part"}, {call.kwargs["image_part"] for call in extract_mock.call_args_list})
         self.assertEqual(1, save_mock.call_count)
         self.assertEqual(1, update_mock.call_count)
         self.assertEqual(1, diff_mock.call_count)
@@ -275,6 +408,32 @@ class ExtractionGuardrailTests(unittest.TestCase):
         self.assertEqual(2, qa["accepted_attempt"])
         self.assertEqual("gemini-test", qa["model_name"])
 
+    def test_run_extraction_jobs_processes_every_report_concurrently(self):
+        module = load_llm_extraction_module()
+        reports = [{"id": f"id-{i}", "year": "26", "week": str(i), "enhanced_name": f"r{i}.png"} for i in range(5)]
+
+        with patch.object(module, "process_single_report", side_effect=lambda report, *_: report["week"] != "3"):
+            results = list(module.run_extraction_jobs(reports, "gemini-test", object(), workers=3))
+
+        self.assertEqual(sorted(r["id"] for r in reports), sorted(report["id"] for report, _ in results))
+        self.assertEqual(4, sum(success for _, success in results))
+
+    def test_run_extraction_jobs_counts_unexpected_errors_as_failures(self):
+        module = load_llm_extraction_module()
+        reports = [{"id": f"id-{i}", "year": "26", "week": str(i), "enhanced_name": f"r{i}.png"} for i in range(2)]
+
+        def process(report, *_):
+            if report["id"] == "id-0":
+                raise OSError("disk full")
+            return True
+
+        with patch.object(module, "process_single_report", side_effect=process), \
+            patch.object(module, "_record_extraction_review") as review_mock:
+            results = dict((report["id"], success) for report, success in module.run_extraction_jobs(reports, "gemini-test", object(), workers=2))
+
+        self.assertEqual({"id-0": False, "id-1": True}, results)
+        self.assertEqual("extraction_exception", review_mock.call_args.args[4])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -162,6 +162,36 @@ class LocalExtractionSmokeTests(unittest.TestCase):
         self.assertEqual("fail", summary["status"])
         self.assertIn("GOOGLE_API_KEY", summary["errors"][0])
 
+    def test_gemini_retry_adds_one_call_and_reuses_earlier_outputs(self):
+        rows = [
+            {"States": "Ondo", "Suspected": "51", "Confirmed": "3", "Probable": "", "HCW": "", "Deaths": ""},
+            {"States": "Total", "Suspected": "51", "Confirmed": "3", "Probable": "", "HCW": "", "Deaths": ""},
+        ]
+        differing_rows = [dict(row) for row in rows]
+        differing_rows[1]["Confirmed"] = "4"
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            image_path = temp_path / "Lines_Nigeria_03_May_25_W18_page3.png"
+            self.write_png(image_path)
+
+            with patch.dict("os.environ", {"GOOGLE_API_KEY": "test-key"}, clear=False), \
+                patch(
+                    "src.utils.gemini_extractor.extract_table_with_gemini",
+                    side_effect=[(True, "r1"), (True, "r2"), (True, "r3")],
+                ) as extract_mock, \
+                patch(
+                    "src.utils.gemini_extractor.parse_gemini_response",
+                    side_effect=[(True, rows), (True, differing_rows), (True, [dict(row) for row in rows])],
+                ):
+                result = self.smoke.run_gemini_extraction(
+                    image_path, temp_path / "out", image_path.name, year="2025", week="18"
+                )
+
+        self.assertEqual(3, extract_mock.call_count)
+        self.assertEqual(["retry", "pass"], [attempt["status"] for attempt in result["attempts"]])
+        self.assertEqual(2, result["extraction_qa"]["accepted_attempt"])
+
     def test_pdf_command_uses_scratch_output_and_mocked_enhancement(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
@@ -0,0 +1,46 @@
+import unittest
+
+from src.utils.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+class RateLimiterTests(unittest.TestCase):
+    def test_burst_up_to_rate_then_spaces_requests(self):
+        clock = FakeClock()
+        limiter = RateLimiter(3, period=60, clock=clock, sleep=clock.sleep)
+
+        for _ in range(5):
+            limiter.acquire()
+
+        # Three immediate requests, then the fourth and fifth wait for 20s refills
+        self.assertEqual([20.0, 40.0], clock.sleeps)
+
+    def test_idle_time_refills_bucket(self):
+        clock = FakeClock()
+        limiter = RateLimiter(2, period=60, clock=clock, sleep=clock.sleep)
+        limiter.acquire()
+        limiter.acquire()
+
+        clock.now = 30.0
+        limiter.acquire()
+
+        self.assertEqual([], clock.sleeps)
+
+    def test_rejects_non_positive_rate(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+
+from src.utils import sync_context
+from src.utils.sync_context import SyncContext
+
+
+BUCKET_FILES = {
+    "lassa-reports/data/raw/year/2025/Nigeria_01_Jan_25_W01.pdf",
+    "lassa-reports/data/processed/PDF/PDFs_Lines_2025/Lines_Nigeria_01_Jan_25_W01_page3.png",
+    "lassa-reports/data/processed/PDF/PDFs_Lines_2025/Lines_Nigeria_01_Jan_25_W01_page3.layout_qa.json",
+}
+
+
+class SyncContextTests(unittest.TestCase):
+    def test_lists_bucket_once_for_multiple_prefixes(self):
+        ctx = SyncContext(engine=object())
+
+        with patch.object(sync_context, "get_b2_file_list", return_value=set(BUCKET_FILES)) as listing:
+            pdfs = ctx.b2_report_filenames("lassa-reports/data/raw/year/", ".pdf")
+            pngs = ctx.b2_report_filenames("lassa-reports/data/processed/PDF/", ".png")
+            layout_qa = ctx.b2_report_filenames("lassa-reports/data/processed/PDF/", ".layout_qa.json")
+            pngs_again = ctx.b2_report_filenames("lassa-reports/data/processed/PDF/", ".png")
+
+        self.assertEqual(listing.call_count, 1)
+        self.assertEqual(pdfs, {"Nigeria_01_Jan_25_W01.pdf"})
+        self.assertEqual(pngs, {"Lines_Nigeria_01_Jan_25_W01_page3.png"})
+        self.assertEqual(layout_qa, {"Lines_Nigeria_01_Jan_25_W01_page3.layout_qa.json"})
+        self.assertIs(pngs_again, pngs)
+
+    def test_empty_listing_is_not_cached(self):
+        ctx = SyncContext(engine=object())
+
+        with patch.object(sync_context, "get_b2_file_list", side_effect=[set(), set(BUCKET_FILES)]) as listing:
+            first = ctx.b2_report_filenames("lassa-reports/data/raw/year/", ".pdf")
+            second = ctx.b2_report_filenames("lassa-reports/data/raw/year/", ".pdf")
+
+        self.assertEqual(listing.call_count, 2)
+        self.assertEqual(first, set())
+        self.assertEqual(second, {"Nigeria_01_Jan_25_W01.pdf"})
+
+    def test_b2_auth_failure_returns_uncached_empty_set(self):
+        ctx = SyncContext(engine=object())
+
+        with patch("src.utils.cloud_storage.get_b2_api", side_effect=RuntimeError("auth failed")), \
+            self.assertLogs(level="ERROR"):
+            first = ctx.b2_report_filenames("lassa-reports/data/raw/year/", ".pdf")
+
+        with patch.object(sync_context, "get_b2_file_list", return_value=set(BUCKET_FILES)):
+            second = ctx.b2_report_filenames("lassa-reports/data/raw/year/", ".pdf")
+
+        self.assertEqual(set(), first)
+        self.assertEqual({"Nigeria_01_Jan_25_W01.pdf"}, second)
+
+    def test_build_returns_none_without_database_url(self):
+        with patch.dict(sync_context.os.environ, {}, clear=True):
+            with self.assertLogs(level="CRITICAL"):
+                self.assertIsNone(sync_context.build_sync_context())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import cv2
+import fitz
+import numpy as np
+
+from src.utils.table_enhancement import (
+    DEFAULT_PARAMS,
+    LINE_COLOR,
+    _draw_horizontal_segments,
+    _draw_vertical_rules,
+    GREEN_ROW_MIN_PIXELS,
+    crop_width_ratio,
+    detect_green_rows,
+    enhance_report_job,
+    enhance_report_pdf,
+    enhance_table_lines_from_pdf_hq,
+    opencv_has_avx2,
+    process_horizontal_lines,
+    process_vertical_lines,
+    threshold_table_region,
+)
+
+
+# Pale green inside DEFAULT_PARAMS' HSV band, as used for alternating table rows.
+GREEN_ROW_RGB = (208 / 255, 220 / 255, 200 / 255)
+COLUMN_XS = [40, 120, 170, 220, 270, 320, 560]
+
+
+def write_table_pdf(path, table_page_index=3, table_top=220):
+    """Write a small report-like PDF with a green-striped ruled table."""
+    doc = fitz.open()
+    for page_index in range(table_page_index + 1):
+        page = doc.new_page(width=595, height=842)
+        if page_index != table_page_index:
+            continue
+        page.insert_text((50, 100), "Table 3. Weekly and Cumulative number of suspected and confirmed cases for 2025")
+        for row in range(12):
+            y = table_top + row * 30
+            if row % 2 == 0:
+                page.draw_rect(fitz.Rect(40, y, 560, y + 15), color=None, fill=GREEN_ROW_RGB)
+            page.draw_line((40, y), (560, y), color=(0, 0, 0), width=0.5)
+            page.insert_text((45, y + 12), f"State{row} 1 2 3 4", fontsize=8)
+        for x in COLUMN_XS:
+            page.draw_line((x, table_top - 5), (x, table_top + 360), color=(0, 0, 0), width=0.6)
+    doc.save(path)
+    doc.close()
+
+
+class TableEnhancementTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.pdf_path = self.temp_path / "Nigeria_03_May_25_W18.pdf"
+        write_table_pdf(self.pdf_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def enhance(self, output_name, **overrides):
+        params = DEFAULT_PARAMS.copy()
+        params.update(overrides)
+        output_path = self.temp_path / output_name
+        result = enhance_table_lines_from_pdf_hq(
+            str(self.pdf_path),
+            str(output_path),
+            **params,
+            year="25",
+            week="18",
+        )
+        return result, output_path
+
+    def test_writes_cropped_table_png_at_default_dpi(self):
+        result, output_path = self.enhance("enhanced.png")
+
+        self.assertTrue(result)
+        image = cv2.imread(str(output_path))
+        self.assertIsNotNone(image)
+        page_width = round(595 * DEFAULT_PARAMS["dpi"] / 72)
+        self.assertAlmostEqual(image.shape[1], int(page_width * 0.59) - int(page_width * 0.07), delta=2)
+
+    def test_otsu_threshold_writes_same_size_png(self):
+        _, adaptive_path = self.enhance("adaptive.png")
+        result, otsu_path = self.enhance("otsu.png", threshold_method="otsu")
+
+        self.assertTrue(result)
+        self.assertEqual(cv2.imread(str(adaptive_path)).shape, cv2.imread(str(otsu_path)).shape)
+
+    def test_threshold_table_region_rejects_unknown_method(self):
+        region = np.full((20, 20), 255, dtype=np.uint8)
+        region[:, 10] = 0
+
+        self.assertEqual(255, threshold_table_region(region, "otsu")[0, 10])
+        with self.assertRaises(ValueError):
+            threshold_table_region(region, "sauvola")
+
+    def test_lower_dpi_scales_crop_proportionally(self):
+        _, full_path = self.enhance("full.png")
+        _, half_path = self.enhance("half.png", dpi=300)
+
+        full = cv2.imread(str(full_path))
+        half = cv2.imread(str(half_path))
+        self.assertAlmostEqual(half.shape[0], full.shape[0] / 2, delta=4)
+        self.assertAlmostEqual(half.shape[1], full.shape[1] / 2, delta=4)
+
+    def test_crop_is_clamped_to_page_when_table_starts_near_top(self):
+        write_table_pdf(self.pdf_path, table_top=20)
+
+        result, output_path = self.enhance("top.png")
+
+        self.assertTrue(result)
+        image = cv2.imread(str(output_path))
+        # The 360px header margin above the green rows is cut at the page edge.
+        green_top = round(20 * DEFAULT_PARAMS["dpi"] / 72)
+        self.assertLess(image.shape[0], 12 * 30 * DEFAULT_PARAMS["dpi"] / 72 + green_top + 60)
+        self.assertGreater(image.shape[0], 10 * 30 * DEFAULT_PARAMS["dpi"] / 72)
+
+    def test_page_number_from_caller_is_not_overridden_for_2020_week_23(self):
+        output_path = self.temp_path / "w23.png"
+        params = DEFAULT_PARAMS.copy()
+
+        # The synthetic report has four pages; the old override jumped to index 4.
+        self.assertTrue(enhance_table_lines_from_pdf_hq(str(self.pdf_path), str(output_path), **params, year="20", week="23"))
+
+    def test_detect_green_rows_requires_more_than_min_pixels_per_row(self):
+        hsv = np.zeros((10, GREEN_ROW_MIN_PIXELS + 10, 3), dtype=np.uint8)
+        green = (45, 10, 240)
+        hsv[2, : GREEN_ROW_MIN_PIXELS] = green
+        hsv[4, : GREEN_ROW_MIN_PIXELS + 1] = green
+        hsv[7, : GREEN_ROW_MIN_PIXELS + 5] = green
+        lower = np.array([40, 0, 210], dtype=np.uint8)
+        upper = np.array([50, 30, 255], dtype=np.uint8)
+
+        self.assertEqual((4, 7), detect_green_rows(hsv, lower, upper, "fake.pdf"))
+
+    def test_enhance_report_job_writes_png_and_layout_qa(self):
+        output_path = self.temp_path / "PDFs_Lines_2025" / "Lines_Nigeria_03_May_25_W18_page3.png"
+        job = {"report_id": "r1", "pdf_path": str(self.pdf_path), "output_path": str(output_path), "year": "25", "week": "18"}
+
+        returned_job, success, error = enhance_report_job(job)
+
+        self.assertIs(returned_job, job)
+        self.assertTrue(success)
+        self.assertIsNone(error)
+        self.assertTrue(output_path.exists())
+        self.assertTrue(output_path.with_name("Lines_Nigeria_03_May_25_W18_page3.layout_qa.json").exists())
+
+    def test_enhance_report_job_reports_errors_instead_of_raising(self):
+        job = {"pdf_path": str(self.pdf_path), "output_path": str(self.temp_path / "out.png"), "year": "25", "week": "18"}
+
+        with patch(
+            "src.utils.table_enhancement.enhance_table_lines_from_pdf_hq",
+            side_effect=RuntimeError("render failed"),
+        ):
+            _, success, error = enhance_report_job(job)
+
+        self.assertFalse(success)
+        self.assertEqual("render failed", error)
+
+    def test_process_vertical_lines_keeps_long_rules_and_drops_text(self):
+        mask = np.zeros((2000, 300), dtype=np.uint8)
+        mask[:, 50:52] = 255
+        mask[:900, 200] = 255
+        mask[940:, 200] = 255  # rule with a 40px gap
+        mask[100:160, 120:130] = 255  # glyph-sized blob
+
+        lines = process_vertical_lines(mask, tr1=1400, linelength1=79, linegap1=50)
+
+        self.assertEqual([50, 51, 200], lines[:, 0].tolist())
+        self.assertTrue((lines[:, 0] == lines[:, 2]).all())
+        self.assertEqual({0}, set(lines[:, 1].tolist()))
+        self.assertEqual({1999}, set(lines[:, 3].tolist()))
+
+    def test_downscaled_horizontal_hough_returns_full_resolution_rules(self):
+        mask = np.zeros((400, 1200), dtype=np.uint8)
+        mask[101:103, 50:1150] = 255
+        mask[301, 50:1150] = 255  # 1px rule survives area downscaling
+
+        full = process_horizontal_lines(mask, downscale=1)
+        half = process_horizontal_lines(mask, downscale=2)
+
+        for lines in (full, half):
+            rows = set(lines[:, 1].tolist()) | set(lines[:, 3].tolist())
+            self.assertTrue(any(abs(y - 101) <= 2 for y in rows))
+            self.assertTrue(any(abs(y - 301) <= 2 for y in rows))
+            self.assertGreater(lines[:, [0, 2]].max(), 1100)
+
+    def test_thick_horizontal_rules_stay_solid_after_enhancement(self):
+        result, output_path = self.enhance("thick_rules.png")
+        self.assertTrue(result)
+
+        image = cv2.imread(str(output_path))
+        column = (image[:, image.shape[1] // 2] == LINE_COLOR).all(axis=1)
+        starts = np.flatnonzero(column[1:] & ~column[:-1]) + 1
+        ends = np.flatnonzero(column[:-1] & ~column[1:]) + 1
+        runs = ends - starts[: len(ends)]
+
+        # Body rules are several pixels thick (the first run is the thin crop
+        # edge); a downscaled Hough pass drawn 1px tall paints 1px stripes
+        self.assertGreater(len(runs), 5)
+        self.assertTrue((runs[1:] >= 3).all(), runs.tolist())
+
+    def test_open_document_is_borrowed_not_closed(self):
+        output_path = self.temp_path / "borrowed.png"
+        with fitz.open(self.pdf_path) as doc:
+            params = DEFAULT_PARAMS.copy()
+            self.assertTrue(enhance_table_lines_from_pdf_hq(doc, str(output_path), **params, year="25", week="18"))
+            self.assertFalse(doc.is_closed)
+        self.assertTrue(output_path.exists())
+
+    def test_unreadable_pdf_writes_failing_layout_qa(self):
+        bad_pdf = self.temp_path / "broken.pdf"
+        bad_pdf.write_bytes(b"not a pdf")
+        output_path = self.temp_path / "Lines_broken_page3.png"
+
+        self.assertFalse(enhance_report_pdf(bad_pdf, output_path, "25", "18"))
+
+        layout_qa = json.loads(output_path.with_name("Lines_broken_page3.layout_qa.json").read_text())
+        self.assertEqual("fail", layout_qa["status"])
+        self.assertFalse(output_path.exists())
+
+    def test_crop_width_ratio_matches_2020_week_layouts(self):
+        self.assertEqual(0.59, crop_width_ratio("25", "30"))
+        self.assertEqual(0.59, crop_width_ratio("20", None))
+        self.assertEqual(0.59, crop_width_ratio("20", "1"))
+        self.assertEqual(0.65, crop_width_ratio("20", "6"))
+        self.assertEqual(0.57, crop_width_ratio("20", "8"))
+        self.assertEqual(0.60, crop_width_ratio("20", "22"))
+        self.assertEqual(0.56, crop_width_ratio("20", "25"))
+        self.assertEqual(0.56, crop_width_ratio("20", "53"))
+
+    def test_opencv_has_avx2_reads_baseline_and_dispatch_lines(self):
+        dispatched = "  CPU/HW features:\n    Baseline:                    SSE SSE2 SSE3\n    Dispatched code generation:  SSE4_1 AVX AVX2 AVX512_SKX\n"
+        sse_only = "    Baseline:                    SSE SSE2\n    Dispatched code generation:  SSE4_1 SSE4_2\n"
+
+        self.assertTrue(opencv_has_avx2(dispatched))
+        self.assertFalse(opencv_has_avx2(sse_only))
+
+    def test_slice_drawing_matches_cv2_line(self):
+        expected = np.full((200, 120, 3), 255, dtype=np.uint8)
+        actual = expected.copy()
+        xs = np.array([0, 10, 11, 60, 119], dtype=np.int32)
+        for x in xs:
+            cv2.line(expected, (int(x), -20), (int(x), 150), LINE_COLOR, 2)
+        segments = np.array([[5, 30, 90, 30], [100, 40, 20, 40], [0, 199, 119, 199], [10, 70, 80, 72]], dtype=np.int32)
+        for x1, y1, x2, y2 in segments:
+            cv2.line(expected, (int(x1), int(y1)), (int(x2), int(y2)), LINE_COLOR, 1)
+
+        _draw_vertical_rules(actual, xs, -20, 150)
+        _draw_horizontal_segments(actual, segments)
+
+        np.testing.assert_array_equal(expected, actual)
+
+
+if __name__ == "__main__":
+    unittest.main()